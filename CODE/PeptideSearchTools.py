@@ -25,6 +25,7 @@
 """ This module starts the application """
 
 #region -------------------------------------------------------------> Imports
+import multiprocessing
 import os
 import platform
 
@@ -136,6 +137,8 @@ class SplashWindow(wx.adv.SplashScreen):
 
 #region -----------------------------------------------------------> Start App
 if __name__ == "__main__":
+	#--> Needed by the process pool in the bundled app
+	multiprocessing.freeze_support()
 	app = PeptideSearchToolApp()
 	app.MainLoop()
 else:
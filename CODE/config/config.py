@@ -130,8 +130,17 @@ size = { # Base size for widgets
 
 #region ----------------------------------------------------------> Extensions
 extLong = { # string for the dlg windows representing the extension of the files
-	'Data': 'txt files (*.txt)|*.txt',
-	'Seq' : 'txt fasta files (*.txt; *.fasta)|*.txt;*.fasta',
+	'Data'  : 'txt files (*.txt)|*.txt',
+	#--> Input files may be compressed, see data.compress
+	'DataIn': (
+		'txt files (*.txt; *.txt.gz; *.txt.bz2; *.txt.xz; *.txt.zst)|'
+		'*.txt;*.txt.gz;*.txt.bz2;*.txt.xz;*.txt.zst'
+	),
+	'Seq'   : (
+		'txt fasta files (*.txt; *.fasta; *.gz; *.bz2; *.xz; *.zst; *.pstdb)|'
+		'*.txt;*.fasta;*.txt.gz;*.fasta.gz;*.txt.bz2;*.fasta.bz2;'
+		'*.txt.xz;*.fasta.xz;*.txt.zst;*.fasta.zst;*.pstdb'
+	),
 }
 #endregion -------------------------------------------------------> Extensions
 
@@ -175,13 +184,20 @@ label = { # Label for wx.Buttons, wx.StaticText, etc
 		'FastaFile': 'Fasta File',
 		'OutFile'  : 'Output File',
 		'PosAA'    : "Positions && AAs",       # && Needed for wxPython
+		'MaxMis'   : 'Maximum mismatches',
+		'TopK'     : 'Top sequences',
+		'MinCount' : 'Minimum count',
 		'CompProt' : 'Only complete proteins',
+		'ZeroCount': 'Report sequences not found',
+		'Occurrence': 'Report positions in the sequence',
+		'AACount'  : 'Report AA counts in the residue numbers',
 	},
 	'ConsensusConf' : { # gui.window.ConsensusConf
 		'Number'  : 'Number of positions',
 		'Create'  : 'Create fields',
 		'Position': 'Residue Numbers',
 		'AA'      : 'Amino Acids',
+		'Append'  : 'Add to the current list',
 	},
 }
 #endregion -----------------------------------------------------------> Labels
@@ -202,20 +218,38 @@ hint = { # Hint for wx.TextCtrl
 			f"Columns to extract from the {label['Peptide']['DataFile']}."),
 	},
 	'Gene' : { # gui.tab.GeneTab
-		'FastaFile': f"Path to the {label['Gene']['FastaFile']}.",
-		'GeneFile' : f"Path to the {label['Gene']['GeneFile']}.",
+		'FastaFile': (
+			f"Path to the {label['Gene']['FastaFile']}. Several files or glob "
+			f"patterns can be given separated by ;."),
+		'GeneFile' : (
+			f"Path to the {label['Gene']['GeneFile']}. A folder or several "
+			f"files or glob patterns separated by ; write one "
+			f"{label['Gene']['OutFile']} for each file."),
 		'OutFile'  : f"Path to the {label['Gene']['OutFile']}.",
 		'ResidueExtract' : (
-			f"Space-separated list of positive integers, e.g. 5 10 20 50. "
-			f"Lengths of the N-terminal peptides to extract from the "
-			f"{label['Gene']['FastaFile']}."),
+			f"Space-separated list of windows, e.g. 5 10 C10 5-20 50:3. "
+			f"N-terminal lengths, C-terminal lengths, residue ranges or "
+			f"residues at each side of a residue."),
 	},
 	'Consensus' : { # gui.tab.ConsensusTab
-		'FastaFile': f"Path to the {label['Consensus']['FastaFile']}.",
+		'FastaFile': (
+			f"Path to the {label['Consensus']['FastaFile']}. Several files or "
+			f"glob patterns can be given separated by ;."),
 		'OutFile'  : f"Path to the {label['Consensus']['OutFile']}.",
 		'PosAA'    : (
 			f"Dictionary e.g. {{2: 'A W', 3: 'S T', 4: 'I A', 'Pos': True}} "
-			f"with the residue numbers to analyse and the AAs to search for."),
+			f"with the residue numbers to analyse and the AAs to search for. "
+			f"A list of dictionaries or the path to a file with one "
+			f"dictionary per line evaluates all of them at once."),
+		'MaxMis' : (
+			f"Non-negative integer, e.g. 1. Number of positions in which the "
+			f"AA may differ from the given AAs."),
+		'TopK' : (
+			f"Positive integer, e.g. 100. Number of sequences with the highest "
+			f"count to report. Leave empty to report all sequences."),
+		'MinCount' : (
+			f"Non-negative integer or percent, e.g. 5 or 1.5%. Minimum count "
+			f"of the sequences to report. Leave empty to report all sequences."),
 	},
 	'ConsensusConf' : { # gui.window.ConsensusConf
 		'Position' : ("Integer (> 0) or NA, e.g. 3."),
@@ -255,17 +289,32 @@ msg = { # Messages for the user
 			'NoPeptide' : (
 				f"There were no N-terminal peptides found in the "
 				f"{label['Peptide']['DataFile']}."),
+			'Zstd' : (
+				f"The {label['Peptide']['DataFile']} is compressed with zstd. "
+				f"Install zstandard to read it."),
 		},
 		'Gene' : { # gui.tab.GeneTab
 			'FastaFile' : (
 				f"Select the path to the {label['Gene']['FastaFile']}."),
+			'FastaFileList' : (
+				f"Only existing files or glob patterns separated by ; can be "
+				f"accepted in {label['Gene']['FastaFile']}."),
+			'Zstd' : (
+				f"Files compressed with zstd cannot be read. Install "
+				f"zstandard to read them."),
 			'GeneFile' : (
 				f"Select the path to the {label['Gene']['GeneFile']}."),
+			'GeneFileList' : (
+				f"Only a folder or existing files or glob patterns separated "
+				f"by ; can be accepted in {label['Gene']['GeneFile']}."),
+			'GeneFileRead' : (
+				f"The {label['Gene']['GeneFile']} could not be read."),
 			'OutFile' : (
 				f"Select the path to the {label['Gene']['OutFile']}."),
 			'ResidueExtract' : (
-				f"Only a list of space-separated positive integer numbers "
-				f"can be accepted in {label['Gene']['ResidueExtract']}."),
+				f"Only a list of space-separated windows, e.g. 10, C10, 5-20 "
+				f"or 50:3, can be accepted in "
+				f"{label['Gene']['ResidueExtract']}."),
 			'NoGene' : (
 				f"There were no Gene names in the given "
 				f"{label['Gene']['GeneFile']}"),
@@ -277,9 +326,31 @@ msg = { # Messages for the user
 		'Consensus' : { # gui.tab.GeneTab
 			'FastaFile' : (
 				f"Select the path to the {label['Consensus']['FastaFile']}."),
+			'FastaFileList' : (
+				f"Only existing files or glob patterns separated by ; can be "
+				f"accepted in {label['Consensus']['FastaFile']}."),
+			'Zstd' : (
+				f"Files compressed with zstd cannot be read. Install "
+				f"zstandard to read them."),
 			'OutFile' : (
 				f"Select the path to the {label['Consensus']['OutFile']}."),
-			'PosAA' : f"Define the {label['Consensus']['PosAA']} to analyse.",
+			'PosAA' : (
+				f"Define the {label['Consensus']['PosAA']} to analyse. Only a "
+				f"dictionary, a list of dictionaries or the path to a file "
+				f"with one dictionary per line can be accepted."),
+			'MaxMis' : (
+				f"Only an integer number greater or equal than 0 "
+				f"can be accepted in {label['Consensus']['MaxMis']}."),
+			'TopK' : (
+				f"Only an integer number greater or equal than 1 "
+				f"can be accepted in {label['Consensus']['TopK']}."),
+			'MinCount' : (
+				f"Only an integer number greater or equal than 0 or a percent, "
+				f"e.g. 1.5%, can be accepted in "
+				f"{label['Consensus']['MinCount']}."),
+			'AACount' : (
+				f"NumPy must be installed to use "
+				f"{label['Consensus']['AACount']}."),
 			'NoConsensusFound' : (
 				f"The consensus sequence was not found in the "
 				f"{label['Consensus']['FastaFile']}."),
@@ -312,6 +383,49 @@ msg = { # Messages for the user
 #region ---------------------------------------------> CONFIGURABLE PARAMETERS
 optAA = dtsOptAA
 
+consensus = { # gui.tab.ConsensusTab
+	#--> Search engine when all residue numbers are NA: AhoCorasick, Regex, 
+	#--> ShiftAnd or Loop. ShiftAnd is always used if mismatches are allowed
+	'Engine' : 'AhoCorasick',
+	#--> Number of processes for the search when all residue numbers are NA.
+	#--> 1 runs the search in the thread of the tab
+	'Workers' : os.cpu_count() or 1,
+	#--> Number of proteins sent at once to each process
+	'ShardSize' : 2000,
+	#--> Search engine when residue numbers are given: NumPy or Mask. Mask is
+	#--> used if NumPy is not installed
+	'PosEngine' : 'NumPy',
+}
+
+fasta = { # data.fasta, used by gui.tab.ConsensusTab & gui.tab.GeneTab
+	#--> Read the fasta file with mmap. The sequences are kept as bytes until
+	#--> they are used
+	'Mmap' : True,
+	#--> Characters (bytes with mmap) read at once
+	'BlockSize' : 1 << 20,
+	#--> Save an index next to the fasta file, e.g. uniprot.fasta.pstidx, so
+	#--> the Gene tab reads only the proteins of the genes in later runs
+	'Index' : True,
+	#--> Read the file in byte ranges of at least RangeSize bytes in a process
+	#--> pool. The Consensus tab uses its pool if all searches are done in the
+	#--> whole sequence and the AAs are not counted. The Gene tab uses Workers 
+	#--> processes unless all fasta files have a valid index. With Index the
+	#--> workers also build the index of the files
+	'Ranges'    : True,
+	'RangeSize' : 1 << 24,
+	'Workers'   : os.cpu_count() or 1,
+}
+
+gene = { # gui.tab.GeneTab
+	#--> Match the names in the Gene File to the GN= of the fasta headers 
+	#--> ignoring the case, e.g. Prkn finds PRKN
+	'CaseFold' : False,
+	#--> Rows of each Gene File kept in memory. More rows are sorted in runs
+	#--> kept in temporary files and merged when the output is written. 0 
+	#--> keeps all rows in memory
+	'BufferRows' : 100000,
+}
+
 #endregion ------------------------------------------> CONFIGURABLE PARAMETERS
 
 # win = { # To track the existence and number of certain windows. 
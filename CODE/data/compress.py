@@ -0,0 +1,279 @@
+# ------------------------------------------------------------------------------
+# Author: Kenny Bravo Rodriguez 2019 (kenny.bravorodriguez@mpi-dortmund.mpg.de)
+#
+# Copyright (c) 2019 Max Planck Institute of Molecular Physiology
+#
+# This complete copyright notice must be included in any revised version of the
+# source code. Additional authorship citations may be added, but existing
+# author citations must be preserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ------------------------------------------------------------------------------
+
+"""Open plain or compressed input files. Nothing in this module depends on
+	wxPython.
+
+	The compression is detected from the first bytes of the file, not from
+	the extension. gzip, bz2 and xz are always available, zstd only if the
+	zstandard package is installed. The decompression runs in a thread that
+	keeps a few chunks ready while the caller parses the previous ones. zlib,
+	bz2 and lzma release the GIL while decompressing, so both overlap.
+"""
+
+#region -------------------------------------------------------------> Imports
+import bz2
+import gzip
+import io
+import lzma
+import queue
+import threading
+
+try:
+	import zstandard as zstd
+except ImportError:
+	zstd = None
+#endregion ----------------------------------------------------------> Imports
+
+#region -----------------------------------------------------------> VARIABLES
+MAGIC = ( # First bytes of the file for each compression
+	(b'\x1f\x8b'         , 'gzip'),
+	(b'BZh'              , 'bz2'),
+	(b'\xfd7zXZ\x00'     , 'xz'),
+	(b'\x28\xb5\x2f\xfd' , 'zstd'),
+)
+#endregion --------------------------------------------------------> VARIABLES
+
+#region -------------------------------------------------------------> Classes
+class ReadAhead(io.RawIOBase):
+	"""Read a binary stream in a thread, keeping up to depth chunks ready
+
+		Parameters
+		----------
+		stream : binary file object
+			Stream to read, e.g. a gzip.GzipFile. It is closed with the
+			ReadAhead
+		chunkSize : int
+			Number of bytes read at once in the thread
+		depth : int
+			Maximum number of chunks waiting to be read
+
+		Attributes
+		----------
+		stream : binary file object
+			Stream to read
+		chunkSize : int
+			Number of bytes read at once in the thread
+		chunks : queue.Queue
+			Chunks read by the thread. b'' marks the end of the stream and an
+			exception raised in the thread is passed as it is
+		chunk : memoryview
+			Part of the current chunk not yet returned
+		stop : threading.Event
+			Tell the thread to stop before the end of the stream
+		thread : threading.Thread
+			Thread reading the stream
+	"""
+	#region --------------------------------------------------> Instance setup
+	def __init__(self, stream, chunkSize=1<<20, depth=4):
+		""""""
+		super().__init__()
+		self.stream    = stream
+		self.chunkSize = chunkSize
+		self.chunks    = queue.Queue(maxsize=depth)
+		self.chunk     = memoryview(b'')
+		self.stop      = threading.Event()
+		self.thread    = threading.Thread(target=self.Produce, daemon=True)
+		self.thread.start()
+	#---
+	#endregion -----------------------------------------------> Instance setup
+
+	#region ---------------------------------------------------> Class methods
+	def Produce(self):
+		"""Read the stream into self.chunks. Runs in self.thread"""
+		try:
+			while not self.stop.is_set():
+				chunk = self.stream.read(self.chunkSize)
+				self.chunks.put(chunk)
+				if not chunk:
+					return
+				else:
+					pass
+		except Exception as e:
+			self.chunks.put(e)
+	#---
+
+	def readable(self):
+		""""""
+		return True
+	#---
+
+	def readinto(self, b):
+		"""Copy the next decompressed bytes into b
+
+			Parameters
+			----------
+			b : writable bytes-like object
+				Buffer to fill
+
+			Returns
+			-------
+			int
+				Number of bytes copied. 0 at the end of the stream
+		"""
+		#region -------------------------------------------------> Next chunk
+		if not self.chunk:
+			chunk = self.chunks.get()
+			if isinstance(chunk, Exception):
+				#--> Leave the exception for later calls, like the end mark
+				self.chunks.put(chunk)
+				raise chunk
+			elif not chunk:
+				#--> Leave the end mark for later calls
+				self.chunks.put(chunk)
+				return 0
+			else:
+				self.chunk = memoryview(chunk)
+		else:
+			pass
+		#endregion ----------------------------------------------> Next chunk
+
+		#region --------------------------------------------------------> Copy
+		n          = min(len(b), len(self.chunk))
+		b[0:n]     = self.chunk[0:n]
+		self.chunk = self.chunk[n:]
+		#endregion -----------------------------------------------------> Copy
+
+		return n
+	#---
+
+	def close(self):
+		"""Stop the thread and close the stream"""
+		if not self.closed:
+			self.stop.set()
+			#--> Free a slot in case the thread waits on a full queue
+			while self.thread.is_alive():
+				try:
+					self.chunks.get(timeout=0.1)
+				except queue.Empty:
+					pass
+			self.stream.close()
+		else:
+			pass
+		super().close()
+	#---
+	#endregion ------------------------------------------------> Class methods
+#---
+#endregion ----------------------------------------------------------> Classes
+
+#region -------------------------------------------------------------> Methods
+def Codec(fFile):
+	"""Compression of a file
+
+		Parameters
+		----------
+		fFile : str or Path
+			Path to the file
+
+		Returns
+		-------
+		str or None
+			'gzip', 'bz2', 'xz' or 'zstd'. None for plain files
+	"""
+	with open(fFile, 'rb') as file:
+		head = file.read(6)
+	for magic, codec in MAGIC:
+		if head.startswith(magic):
+			return codec
+		else:
+			pass
+	return None
+#---
+
+def Supported(fFile):
+	"""Check the compression of a file can be read. zstd needs zstandard
+
+		Parameters
+		----------
+		fFile : str or Path
+			Path to the file
+
+		Returns
+		-------
+		bool
+	"""
+	return not (Codec(fFile) == 'zstd' and zstd is None)
+#---
+
+def Open(fFile, mode='r', readAhead=True, chunkSize=1<<20, depth=4):
+	"""Open a plain or compressed file for reading
+
+		Parameters
+		----------
+		fFile : str or Path
+			Path to the file
+		mode : str
+			'r' for text or 'rb' for bytes
+		readAhead : bool
+			Decompress in a thread while the file is being read. Plain files
+			are read directly
+		chunkSize : int
+			Number of bytes decompressed at once in the thread
+		depth : int
+			Maximum number of decompressed chunks waiting to be read
+
+		Returns
+		-------
+		file object
+			Same as open(fFile, mode) for a plain file
+
+		Raises
+		------
+		ValueError
+			If the file is compressed with zstd and zstandard is not installed
+	"""
+	#region -----------------------------------------------------> Plain file
+	codec = Codec(fFile)
+	if codec is None:
+		return open(fFile, mode)
+	else:
+		pass
+	#endregion --------------------------------------------------> Plain file
+
+	#region ---------------------------------------------------> Decompressor
+	if codec == 'gzip':
+		stream = gzip.open(fFile, 'rb')
+	elif codec == 'bz2':
+		stream = bz2.open(fFile, 'rb')
+	elif codec == 'xz':
+		stream = lzma.open(fFile, 'rb')
+	elif zstd is not None:
+		stream = zstd.open(fFile, 'rb')
+	else:
+		raise ValueError(
+			f'{fFile} is compressed with zstd. Install zstandard to read it.')
+	#endregion ------------------------------------------------> Decompressor
+
+	#region -----------------------------------------------------> Read ahead
+	if readAhead:
+		stream = io.BufferedReader(
+			ReadAhead(stream, chunkSize=chunkSize, depth=depth),
+			buffer_size = chunkSize,
+		)
+	else:
+		pass
+	#endregion --------------------------------------------------> Read ahead
+
+	return stream if 'b' in mode else io.TextIOWrapper(stream)
+#---
+#endregion ----------------------------------------------------------> Methods
@@ -0,0 +1,1503 @@
+# ------------------------------------------------------------------------------
+# Author: Kenny Bravo Rodriguez 2019 (kenny.bravorodriguez@mpi-dortmund.mpg.de)
+# 
+# Copyright (c) 2019 Max Planck Institute of Molecular Physiology
+#
+# This complete copyright notice must be included in any revised version of the
+# source code. Additional authorship citations may be added, but existing
+# author citations must be preserved.
+# 
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ------------------------------------------------------------------------------
+
+"""Search engines for the consensus sequences. Nothing in this module depends 
+	on wxPython, so the engines can be used in the worker processes.
+
+	All engines have a Find(seq) method returning the list of consensus 
+	sequences found in seq, in the same order as itertools.product. The 
+	exception is PositionMatrix, which collects the residues of all proteins
+	and evaluates them at once. Engines for the whole sequence also have a 
+	FindPos(seq) method returning {conSeq: array of 0-based start positions}
+	in the same order.
+
+	ConsensusSearch holds the engine and the results of one Positions & AAs
+	configuration, so several configurations can share one scan of the fasta
+	file.
+"""
+
+#region -------------------------------------------------------------> Imports
+import ast
+import heapq
+import itertools
+import os
+import re
+from array import array
+from collections import deque
+from operator import itemgetter
+
+try:
+	import numpy as np
+except ImportError:
+	np = None
+#endregion ----------------------------------------------------------> Imports
+
+#region -----------------------------------------------------------> VARIABLES
+EVAL_ERROR = ( # Errors of ast.literal_eval for an invalid text, see ReadPosAA
+	ValueError, SyntaxError, TypeError, MemoryError, RecursionError,
+)
+#endregion --------------------------------------------------------> VARIABLES
+
+#region -------------------------------------------------------------> Classes
+class AhoCorasick():
+	"""Aho-Corasick automaton to search all consensus sequences in a protein
+		sequence with a single scan of the protein sequence.
+
+		Parameters
+		----------
+		patterns : list of str
+			Sequences to search for. The position of each sequence in the list
+			is the id returned by self.Search
+
+		Attributes
+		----------
+		patterns : list of str
+			Sequences to search for
+		goto : list of dict
+			Transitions of each state {AA: next state}
+		fail : list of int
+			Failure transition of each state
+		out : list of tuple
+			Ids of the patterns ending in each state, including the patterns 
+			reached through the failure transitions
+
+		Methods
+		-------
+		Search(seq)
+			Ids of the patterns found in seq
+		SearchPos(seq)
+			Ids and start positions of the patterns found in seq
+		Find(seq)
+			Patterns found in seq
+		FindPos(seq)
+			Patterns found in seq and their start positions
+	"""
+	#region --------------------------------------------------> Instance setup
+	def __init__(self, patterns):
+		""""""
+		#region -----------------------------------------------> Initial setup
+		self.patterns = patterns
+		self.goto     = [{}]
+		self.fail     = [0]
+		out           = [[]]
+		#endregion --------------------------------------------> Initial setup
+
+		#region ---------------------------------------------------------> Trie
+		for k, p in enumerate(patterns):
+			s = 0
+			for c in p:
+				if (n := self.goto[s].get(c)) is None:
+					n = len(self.goto)
+					self.goto[s][c] = n
+					self.goto.append({})
+					self.fail.append(0)
+					out.append([])
+				else:
+					pass
+				s = n
+			out[s].append(k)
+		#endregion ------------------------------------------------------> Trie
+
+		#region ----------------------------------------> Failure transitions
+		queue = deque(self.goto[0].values())
+		while queue:
+			s = queue.popleft()
+			for c, n in self.goto[s].items():
+				queue.append(n)
+				f = self.fail[s]
+				while f and c not in self.goto[f]:
+					f = self.fail[f]
+				self.fail[n] = self.goto[f].get(c, 0)
+				out[n].extend(out[self.fail[n]])
+		self.out = [tuple(x) for x in out]
+		#endregion -------------------------------------> Failure transitions
+	#---
+	#endregion -----------------------------------------------> Instance setup
+
+	#region ---------------------------------------------------> Class methods
+	def Search(self, seq):
+		"""Search all patterns in seq
+
+			Parameters
+			----------
+			seq : str
+				Protein sequence
+
+			Returns
+			-------
+			set
+				Ids of the patterns found in seq
+		"""
+		#region ---------------------------------------------------> Variables
+		goto  = self.goto
+		fail  = self.fail
+		out   = self.out
+		found = set()
+		s     = 0
+		#endregion ------------------------------------------------> Variables
+
+		#region ------------------------------------------------------> Search
+		for c in seq:
+			while (n := goto[s].get(c)) is None and s:
+				s = fail[s]
+			s = 0 if n is None else n
+			if out[s]:
+				found.update(out[s])
+			else:
+				pass
+		#endregion ---------------------------------------------------> Search
+
+		return found
+	#---
+
+	def SearchPos(self, seq):
+		"""Search all patterns in seq and get their start positions
+
+			Parameters
+			----------
+			seq : str
+				Protein sequence
+
+			Returns
+			-------
+			dict
+				{Id: array of 0-based start positions}
+		"""
+		#region ---------------------------------------------------> Variables
+		goto     = self.goto
+		fail     = self.fail
+		out      = self.out
+		patterns = self.patterns
+		found    = {}
+		s        = 0
+		#endregion ------------------------------------------------> Variables
+
+		#region ------------------------------------------------------> Search
+		for i, c in enumerate(seq):
+			while (n := goto[s].get(c)) is None and s:
+				s = fail[s]
+			s = 0 if n is None else n
+			for x in out[s]:
+				if x not in found:
+					found[x] = array('L')
+				else:
+					pass
+				found[x].append(i - len(patterns[x]) + 1)
+		#endregion ---------------------------------------------------> Search
+
+		return found
+	#---
+
+	def Find(self, seq):
+		"""Patterns found in seq in the same order as in self.patterns
+
+			Parameters
+			----------
+			seq : str
+				Protein sequence
+
+			Returns
+			-------
+			list of str
+		"""
+		return [self.patterns[x] for x in sorted(self.Search(seq))]
+	#---
+
+	def FindPos(self, seq):
+		"""Patterns found in seq in the same order as in self.patterns and
+			their start positions
+
+			Parameters
+			----------
+			seq : str
+				Protein sequence
+
+			Returns
+			-------
+			dict
+				{Pattern: array of 0-based start positions}
+		"""
+		found = self.SearchPos(seq)
+		return {self.patterns[x]: found[x] for x in sorted(found)}
+	#---
+	#endregion ------------------------------------------------> Class methods
+#---
+
+class PatternLoop():
+	"""Search the patterns one after the other with the in operator
+
+		Parameters
+		----------
+		patterns : list of str
+			Sequences to search for
+
+		Attributes
+		----------
+		patterns : list of str
+			Sequences to search for
+
+		Methods
+		-------
+		Find(seq)
+			Patterns found in seq
+		FindPos(seq)
+			Patterns found in seq and their start positions
+	"""
+	#region --------------------------------------------------> Instance setup
+	def __init__(self, patterns):
+		""""""
+		self.patterns = patterns
+	#---
+	#endregion -----------------------------------------------> Instance setup
+
+	#region ---------------------------------------------------> Class methods
+	def Find(self, seq):
+		"""Patterns found in seq in the same order as in self.patterns
+
+			Parameters
+			----------
+			seq : str
+				Protein sequence
+
+			Returns
+			-------
+			list of str
+		"""
+		return [p for p in self.patterns if p in seq]
+	#---
+
+	def FindPos(self, seq):
+		"""Patterns found in seq in the same order as in self.patterns and
+			their start positions
+
+			Parameters
+			----------
+			seq : str
+				Protein sequence
+
+			Returns
+			-------
+			dict
+				{Pattern: array of 0-based start positions}
+		"""
+		found = {}
+		for p in self.patterns:
+			i = seq.find(p)
+			while i != -1:
+				if p not in found:
+					found[p] = array('L')
+				else:
+					pass
+				found[p].append(i)
+				i = seq.find(p, i+1)
+		return found
+	#---
+	#endregion ------------------------------------------------> Class methods
+#---
+
+class ProductRank():
+	"""Sort sequences in the same order as itertools.product. Base class for 
+		the engines returning the sequences as found in the protein. Also 
+		used by ConsensusSearch to sort the results.
+
+		Parameters
+		----------
+		allAA : list of list of str
+			Allowed AAs in each position, e.g. [['A', 'W'], ['S', 'T']]
+
+		Attributes
+		----------
+		rank : list of dict
+			Order of the AAs in each position [{'A': 0, 'W': 1}, ...]
+
+		Methods
+		-------
+		Rank(seq)
+			Sort key of a sequence
+	"""
+	#region --------------------------------------------------> Instance setup
+	def __init__(self, allAA):
+		""""""
+		self.rank = [{aa: i for i, aa in enumerate(x)} for x in allAA]
+	#---
+	#endregion -----------------------------------------------> Instance setup
+
+	#region ---------------------------------------------------> Class methods
+	def Rank(self, seq):
+		"""Sort key of a sequence. Not allowed AAs are placed after the 
+			allowed ones.
+
+			Parameters
+			----------
+			seq : str
+				Sequence
+
+			Returns
+			-------
+			tuple
+		"""
+		return tuple(r.get(aa, len(r)+ord(aa)) for r, aa in zip(self.rank, seq))
+	#---
+	#endregion ------------------------------------------------> Class methods
+#---
+
+class ShiftAnd(ProductRank):
+	"""Bit-parallel (Shift-And) search of the consensus sequences allowing a
+		maximum number of mismatches. Each bit of the state is a position of
+		the consensus sequence, so the protein is scanned once and the 
+		consensus sequences are never enumerated.
+
+		Parameters
+		----------
+		allAA : list of list of str
+			Allowed AAs in each position, e.g. [['A', 'W'], ['S', 'T']]
+		maxMis : int
+			Maximum number of mismatches
+
+		Attributes
+		----------
+		length : int
+			Length of the consensus sequences
+		maxMis : int
+			Maximum number of mismatches
+		mask : dict
+			Positions in which each AA is allowed {AA: int}
+		full : int
+			All positions set
+		last : int
+			Bit of the last position
+
+		Methods
+		-------
+		Find(seq)
+			Sequences in seq matching the consensus sequences
+		FindPos(seq)
+			Sequences in seq matching the consensus sequences and their start
+			positions
+	"""
+	#region --------------------------------------------------> Instance setup
+	def __init__(self, allAA, maxMis=0):
+		""""""
+		#region ---------------------------------------------------> Variables
+		ProductRank.__init__(self, allAA)
+		self.length = len(allAA)
+		self.maxMis = min(maxMis, self.length)
+		self.full   = (1 << self.length) - 1
+		self.last   = 1 << (self.length - 1)
+		#endregion ------------------------------------------------> Variables
+
+		#region --------------------------------------------------------> Mask
+		self.mask = {}
+		for k, aaL in enumerate(allAA):
+			for aa in aaL:
+				self.mask[aa] = self.mask.get(aa, 0) | (1 << k)
+		#endregion -----------------------------------------------------> Mask
+	#---
+	#endregion -----------------------------------------------> Instance setup
+
+	#region ---------------------------------------------------> Class methods
+	def Find(self, seq):
+		"""Sequences in seq with at most self.maxMis mismatches with respect 
+			to the consensus sequences
+
+			Parameters
+			----------
+			seq : str
+				Protein sequence
+
+			Returns
+			-------
+			list of str
+				Each sequence is given only once. Not allowed AAs are sorted
+				after the allowed ones.
+		"""
+		return list(self.FindPos(seq))
+	#---
+
+	def FindPos(self, seq):
+		"""Sequences in seq with at most self.maxMis mismatches with respect 
+			to the consensus sequences and their start positions
+
+			Parameters
+			----------
+			seq : str
+				Protein sequence
+
+			Returns
+			-------
+			dict
+				{Sequence: array of 0-based start positions}. Not allowed AAs 
+				are sorted after the allowed ones.
+
+			Notes
+			-----
+			State d has bit j set if seq[i-j:i+1] matches the first j+1 
+			positions with at most d mismatches.
+		"""
+		#region ---------------------------------------------------> Variables
+		mask  = self.mask
+		full  = self.full
+		last  = self.last
+		L     = self.length
+		k     = self.maxMis
+		state = [0] * (k + 1)
+		found = {}
+		#endregion ------------------------------------------------> Variables
+
+		#region ------------------------------------------------------> Search
+		for i, aa in enumerate(seq):
+			b    = mask.get(aa, 0)
+			prev = state[0]
+			state[0] = ((prev << 1) | 1) & b
+			for d in range(1, k + 1):
+				cur = state[d]
+				state[d] = ((((cur << 1) | 1) & b) | ((prev << 1) | 1)) & full
+				prev = cur
+			if state[k] & last:
+				if (w := seq[i-L+1:i+1]) not in found:
+					found[w] = array('L')
+				else:
+					pass
+				found[w].append(i-L+1)
+			else:
+				pass
+		#endregion ---------------------------------------------------> Search
+
+		return {k: found[k] for k in sorted(found, key=self.Rank)}
+	#---
+
+	#endregion ------------------------------------------------> Class methods
+#---
+
+class RegexClass(ProductRank):
+	"""Search the consensus sequences with a single regular expression made
+		of one character class per position, e.g. (?=([AW][ST][IA])). The 
+		lookahead returns overlapping sequences.
+
+		Parameters
+		----------
+		allAA : list of list of str
+			Allowed AAs in each position, e.g. [['A', 'W'], ['S', 'T']]
+
+		Attributes
+		----------
+		regex : re.Pattern
+			Compiled regular expression
+
+		Methods
+		-------
+		Find(seq)
+			Consensus sequences found in seq
+		FindPos(seq)
+			Consensus sequences found in seq and their start positions
+	"""
+	#region --------------------------------------------------> Instance setup
+	def __init__(self, allAA):
+		""""""
+		ProductRank.__init__(self, allAA)
+		self.regex = re.compile(
+			"(?=(" 
+			+ "".join([f"[{re.escape(''.join(aaL))}]" for aaL in allAA])
+			+ "))"
+		)
+	#---
+	#endregion -----------------------------------------------> Instance setup
+
+	#region ---------------------------------------------------> Class methods
+	def Find(self, seq):
+		"""Consensus sequences found in seq
+
+			Parameters
+			----------
+			seq : str
+				Protein sequence
+
+			Returns
+			-------
+			list of str
+		"""
+		return sorted(
+			{m.group(1) for m in self.regex.finditer(seq)}, 
+			key = self.Rank,
+		)
+	#---
+
+	def FindPos(self, seq):
+		"""Consensus sequences found in seq and their start positions
+
+			Parameters
+			----------
+			seq : str
+				Protein sequence
+
+			Returns
+			-------
+			dict
+				{conSeq: array of 0-based start positions}
+		"""
+		found = {}
+		for m in self.regex.finditer(seq):
+			if (k := m.group(1)) not in found:
+				found[k] = array('L')
+			else:
+				pass
+			found[k].append(m.start())
+		return {k: found[k] for k in sorted(found, key=self.Rank)}
+	#---
+	#endregion ------------------------------------------------> Class methods
+#---
+
+class PositionClass():
+	"""Allowed AAs in each residue number of the consensus sequence, coded as
+		a bit mask per residue number.
+
+		Parameters
+		----------
+		resID : list of int
+			Residue numbers in which to look for the consensus sequence
+		allAA : list of list of str
+			Allowed AAs in each residue number, e.g. [['A', 'W'], ['S', 'T']]
+		maxMis : int
+			Maximum number of residue numbers with a not allowed AA
+
+		Attributes
+		----------
+		maxMis : int
+			Maximum number of residue numbers with a not allowed AA
+		index : tuple of int
+			0-based index of the residue numbers
+		bit : dict
+			Bit of each AA {AA: int}
+		mask : tuple of int
+			Bit mask with the allowed AAs in each residue number
+
+		Methods
+		-------
+		Search(seq)
+			Sequence in the residue numbers if all AAs are allowed
+		Find(seq)
+			Consensus sequence found in seq
+	"""
+	#region --------------------------------------------------> Instance setup
+	def __init__(self, resID, allAA, maxMis=0):
+		""""""
+		#region ---------------------------------------------------> Variables
+		self.maxMis = maxMis
+		self.index  = tuple(x-1 for x in resID)
+		self.bit   = {}
+		for aaL in allAA:
+			for aa in aaL:
+				self.bit.setdefault(aa, 1 << len(self.bit))
+		#endregion ------------------------------------------------> Variables
+
+		#region --------------------------------------------------------> Mask
+		mask = []
+		for aaL in allAA:
+			m = 0
+			for aa in aaL:
+				m |= self.bit[aa]
+			mask.append(m)
+		self.mask = tuple(mask)
+		#endregion -----------------------------------------------------> Mask
+	#---
+	#endregion -----------------------------------------------> Instance setup
+
+	#region ---------------------------------------------------> Class methods
+	def Search(self, seq):
+		"""Get the sequence in the residue numbers 
+
+			Parameters
+			----------
+			seq : str
+				Protein sequence
+
+			Returns
+			-------
+			str or None
+				Sequence in the residue numbers or None if the protein is too
+				short or more than self.maxMis AAs are not allowed in their
+				residue number
+		"""
+		#region -------------------------------------------------> Get residues
+		try:
+			res = [seq[x] for x in self.index]
+		except IndexError:
+			return None
+		#endregion ----------------------------------------------> Get residues
+
+		#region -------------------------------------------------------> Check
+		bit = self.bit
+		mis = self.maxMis
+		for aa, m in zip(res, self.mask):
+			if bit.get(aa, 0) & m:
+				pass
+			elif mis:
+				mis -= 1
+			else:
+				return None
+		#endregion ----------------------------------------------------> Check
+
+		return "".join(res)
+	#---
+
+	def Find(self, seq):
+		"""Consensus sequence found in seq
+
+			Parameters
+			----------
+			seq : str
+				Protein sequence
+
+			Returns
+			-------
+			list of str
+				Empty or with only one element
+		"""
+		return [] if (s := self.Search(seq)) is None else [s]
+	#---
+	#endregion ------------------------------------------------> Class methods
+#---
+
+class PositionMatrix():
+	"""Residues in the residue numbers of all proteins as a 2-D uint8 array
+		(protein x residue number). The allowed AAs are evaluated with 
+		vectorised lookups after reading all proteins. Requires NumPy.
+
+		Parameters
+		----------
+		resID : list of int
+			Residue numbers in which to look for the consensus sequence
+		allAA : list of list of str
+			Allowed AAs in each residue number, e.g. [['A', 'W'], ['S', 'T']]
+		maxMis : int
+			Maximum number of residue numbers with a not allowed AA
+
+		Attributes
+		----------
+		maxMis : int
+			Maximum number of residue numbers with a not allowed AA
+		nPos : int
+			Number of residue numbers
+		getRes : operator.itemgetter
+			Get the residues in the residue numbers from a sequence
+		minLen : int
+			Minimum length of the sequence to have all residue numbers
+		allowed : np.ndarray
+			bool array (residue number x 256) with the allowed AAs
+		buf : bytearray
+			Residues of the proteins added so far
+		label : list
+			Label of each protein added so far, e.g. the Protein ID
+
+		Methods
+		-------
+		Add(seq, label)
+			Add the residues of a protein
+		Evaluate()
+			Find the consensus sequence of each protein
+	"""
+	#region --------------------------------------------------> Instance setup
+	def __init__(self, resID, allAA, maxMis=0):
+		""""""
+		#region ---------------------------------------------------> Variables
+		self.maxMis = maxMis
+		self.nPos   = len(resID)
+		self.getRes = itemgetter(*[x-1 for x in resID])
+		self.minLen = max(resID)
+		self.buf    = bytearray()
+		self.label  = []
+		#endregion ------------------------------------------------> Variables
+
+		#region -----------------------------------------------> Allowed table
+		self.allowed = np.zeros((self.nPos, 256), dtype=bool)
+		for k, aaL in enumerate(allAA):
+			for aa in aaL:
+				self.allowed[k, ord(aa)] = True
+		#endregion --------------------------------------------> Allowed table
+	#---
+	#endregion -----------------------------------------------> Instance setup
+
+	#region ---------------------------------------------------> Class methods
+	def Add(self, seq, label):
+		"""Add the residues of a protein
+
+			Parameters
+			----------
+			seq : str
+				Protein sequence
+			label : object
+				Label of the protein, e.g. the Protein ID
+
+			Returns
+			-------
+			bool
+				False if the protein is shorter than the largest residue number
+		"""
+		#region -------------------------------------------------------> Check
+		if len(seq) < self.minLen:
+			return False
+		else:
+			pass
+		#endregion ----------------------------------------------------> Check
+
+		#region ---------------------------------------------------------> Add
+		self.buf.extend("".join(self.getRes(seq)).encode('latin-1', 'replace'))
+		self.label.append(label)
+		#endregion ------------------------------------------------------> Add
+
+		return True
+	#---
+
+	def Evaluate(self):
+		"""Find the consensus sequence of each protein
+
+			Returns
+			-------
+			list of tuple
+				[(conSeq, count, [label, ...]), ...]. Consensus sequences are 
+				sorted by their bytes and labels are in the order they were 
+				added.
+		"""
+		#region ------------------------------------------------------> Matrix
+		m = np.frombuffer(bytes(self.buf), dtype=np.uint8).reshape(-1, self.nPos)
+		#endregion ---------------------------------------------------> Matrix
+
+		#region -------------------------------------------> Allowed proteins
+		ok   = self.allowed[np.arange(self.nPos), m]
+		rows = np.flatnonzero((self.nPos - ok.sum(axis=1)) <= self.maxMis)
+		if rows.size == 0:
+			return []
+		else:
+			pass
+		#endregion ----------------------------------------> Allowed proteins
+
+		#region -------------------------------------------------------> Count
+		#--> Each row as a single value
+		code = np.ascontiguousarray(m[rows]).view(
+			np.dtype((np.void, self.nPos))).ravel()
+		uniq, inverse, count = np.unique(
+			code, return_inverse=True, return_counts=True)
+		#--> Rows of each consensus sequence keeping the order of the proteins
+		order = rows[np.argsort(inverse.ravel(), kind='stable')]
+		end   = np.cumsum(count)
+		#endregion ----------------------------------------------------> Count
+
+		#region ------------------------------------------------------> Result
+		res = []
+		for u, n, e in zip(uniq, count.tolist(), end.tolist()):
+			res.append((
+				u.tobytes().decode('latin-1'),
+				n,
+				[self.label[x] for x in order[e-n:e].tolist()],
+			))
+		#endregion ---------------------------------------------------> Result
+
+		return res
+	#---
+	#endregion ------------------------------------------------> Class methods
+#---
+
+class ResidueCount():
+	"""Count of each AA in the residue numbers of all proteins, with complete
+		and fragment proteins counted apart. The residues are only collected
+		while reading the proteins and counted at the end. Requires NumPy.
+
+		Parameters
+		----------
+		resID : list of int
+			Residue numbers in which to count the AAs
+
+		Attributes
+		----------
+		resID : list of int
+			Residue numbers in which to count the AAs
+		nPos : int
+			Number of residue numbers
+		getRes : operator.itemgetter
+			Get the residues in the residue numbers from a sequence
+		minLen : int
+			Minimum length of the sequence to have all residue numbers
+		buf : list of bytearray
+			Residues of the complete (0) and fragment (1) proteins. Residue
+			numbers after the end of the sequence are stored as 0
+
+		Methods
+		-------
+		Add(seq, frag)
+			Add the residues of a protein
+		Count()
+			Count the AAs in each residue number
+	"""
+	#region -----------------------------------------------------> Class setup
+	AA = 'ACDEFGHIKLMNPQRSTVWY' # Columns of the count
+	#endregion --------------------------------------------------> Class setup
+
+	#region --------------------------------------------------> Instance setup
+	def __init__(self, resID):
+		""""""
+		self.resID  = resID
+		self.nPos   = len(resID)
+		self.getRes = itemgetter(*[x-1 for x in resID])
+		self.minLen = max(resID)
+		self.buf    = [bytearray(), bytearray()]
+	#---
+	#endregion -----------------------------------------------> Instance setup
+
+	#region ---------------------------------------------------> Class methods
+	def Add(self, seq, frag):
+		"""Add the residues of a protein
+
+			Parameters
+			----------
+			seq : str
+				Protein sequence
+			frag : bool
+				The protein is a fragment
+		"""
+		if len(seq) >= self.minLen:
+			self.buf[frag].extend(
+				"".join(self.getRes(seq)).encode('latin-1', 'replace'))
+		else:
+			self.buf[frag].extend(bytes(
+				ord(seq[x-1]) & 0xFF if x <= len(seq) else 0
+				for x in self.resID
+			))
+		return True
+	#---
+
+	def Count(self):
+		"""Count the AAs in each residue number
+
+			Returns
+			-------
+			np.ndarray
+				int64 array (complete/fragment x residue number x 21). The
+				columns follow self.AA and the last one counts any other
+				residue, e.g. X or U
+		"""
+		#region ---------------------------------------------------> Variables
+		res  = np.zeros((2, self.nPos, len(self.AA)+1), dtype=np.int64)
+		cols = np.frombuffer(self.AA.encode(), dtype=np.uint8)
+		#-> Offset of each residue number in the flat count
+		step = 256 * np.arange(self.nPos)
+		#endregion ------------------------------------------------> Variables
+
+		#region -------------------------------------------------------> Count
+		for k, buf in enumerate(self.buf):
+			m = np.frombuffer(bytes(buf), dtype=np.uint8).reshape(-1, self.nPos)
+			c = np.bincount(
+				(m + step).ravel(), minlength=256*self.nPos
+			).reshape(self.nPos, 256)
+			res[k, :, :-1] = c[:, cols]
+			#--> Byte 0 marks residue numbers after the end of the sequence
+			res[k, :, -1]  = c[:, 1:].sum(axis=1) - res[k, :, :-1].sum(axis=1)
+		#endregion ----------------------------------------------------> Count
+
+		return res
+	#---
+	#endregion ------------------------------------------------> Class methods
+#---
+
+
+class ConsensusSearch():
+	"""Search and results of one Positions & AAs configuration. Several
+		configurations can be evaluated with the same scan of the fasta file.
+
+		Parameters
+		----------
+		posAA : dict
+			Positions & AAs, e.g. {2: 'A W', 3: 'S T', 'Pos': True}
+		posKey : str
+			Key in posAA telling if the residue numbers are used
+		maxMis : int
+			Maximum number of mismatches
+		topK : int or None
+			Number of sequences to report or None for all sequences
+		minC : int
+			Minimum count of the sequences to report
+		minP : float or None
+			Minimum count of the sequences to report as percent of the
+			searched proteins
+		zeroC : bool
+			Report sequences not found in the proteins
+		occ : bool
+			Report the start positions of the sequences. Only for the search in
+			the whole sequence
+		engine : str
+			Engine for the search in the whole sequence. AhoCorasick, Regex,
+			ShiftAnd or Loop. ShiftAnd is always used if mismatches are allowed
+		posEngine : str
+			Engine for the search in the residue numbers. NumPy or Mask. Mask
+			is used if NumPy is not installed
+		aaCount : bool
+			Count the AAs in the residue numbers. Only for the search in the
+			residue numbers. Requires NumPy
+
+		Attributes
+		----------
+		seqProt : dict
+			{'SeqA' : {Count: 0, PerCent: 0, pID: array}, }. Only the conSeqs
+			found in the proteins. pID holds the indexes in self.protID
+		protSeq : dict
+			{ProtIndex: [SeqA, SeqB], .....}
+		protID : list of str
+			Protein IDs with at least one conSeq. Each ID is stored once
+		protPos : dict
+			{ProtIndex: [array('L'), array('L')], ...}. Start positions of the
+			conSeqs, in the same order as self.protSeq
+		countTotal : int
+			Sum of the counts of all conSeqs
+		aaCount : ResidueCount or None
+			Residues of all proteins in the residue numbers
+		aaCountV : np.ndarray or None
+			Count of the AAs as returned by ResidueCount.Count
+
+		Methods
+		-------
+		Add(protSeq, protID)
+			Search the conSeqs in a protein
+		AddCount(protSeq, frag)
+			Add a protein to the count of the AAs
+		UpdateConsensus(found, protID)
+			Add the conSeqs found in a protein
+		Finish(protsselT)
+			Select & sort the results
+		WriteResults(oFile)
+			Write the results to an open file
+	"""
+	#region --------------------------------------------------> Instance setup
+	def __init__(
+		self, posAA, posKey, maxMis=0, topK=None, minC=0, minP=None,
+		zeroC=True, occ=False, engine='AhoCorasick', posEngine='NumPy',
+		aaCount=False,
+		):
+		""""""
+		#region ------------------------------------------------------> Input
+		self.posAA  = posAA
+		self.maxMis = maxMis
+		self.topK   = topK
+		self.minC   = minC
+		self.minP   = minP
+		self.zeroC  = zeroC
+		#endregion ---------------------------------------------------> Input
+
+		#region ----------------------------------------------------> Prepare
+		#-> Value of Pos key to avoid using the printed name and config....
+		self.Pos = posAA[posKey]
+		#-> List of residues in which to look for the conSeq or None
+		self.resID = [k for k in posAA.keys() if k != posKey] if self.Pos else None
+		#-> List of possible AA in each position [['A', 'C'], ['K', 'R'] ...]
+		self.allAA = [
+			list(dict.fromkeys(x.split()))
+			for x in posAA.values() if type(x) == str
+		]
+		#-> Order of the AAs in each position to sort the conSeqs like in
+		#-> itertools.product(*self.allAA)
+		self.aaRank = ProductRank(self.allAA)
+		#-> Results
+		self.seqProt = {}
+		self.protSeq = {}
+		self.protID  = []
+		self.protIdx = {} # {ProtID: ProtIndex}
+		self.occ     = occ and not self.Pos
+		self.protPos = {}
+		self.countTotal = 0
+		#-> Count of the AAs in the residue numbers
+		self.aaCount  = ResidueCount(self.resID) if aaCount and self.Pos else None
+		self.aaCountV = None
+		#-> Search engine
+		self.matrix = self.Pos and posEngine == 'NumPy' and np is not None
+		if self.matrix:
+			#--> Residues of all proteins evaluated at the end
+			self.engine = PositionMatrix(self.resID, self.allAA, maxMis)
+		elif self.Pos:
+			#--> Allowed AAs in each residue number
+			self.engine = PositionClass(self.resID, self.allAA, maxMis)
+		elif maxMis or engine == 'ShiftAnd':
+			#--> Bit-parallel search allowing mismatches
+			self.engine = ShiftAnd(self.allAA, maxMis)
+		elif engine == 'Regex':
+			#--> One character class per position
+			self.engine = RegexClass(self.allAA)
+		else:
+			conSeq = ["".join(v) for v in itertools.product(*self.allAA)]
+			if engine == 'AhoCorasick':
+				#--> Search all conSeqs with a single scan of the protein
+				self.engine = AhoCorasick(conSeq)
+			else:
+				self.engine = PatternLoop(conSeq)
+		#endregion -------------------------------------------------> Prepare
+	#---
+	#endregion -----------------------------------------------> Instance setup
+
+	#region ---------------------------------------------------> Class methods
+	def Add(self, protSeq, protID):
+		"""Search the conSeqs in a protein. With the NumPy engine the residues
+			are only collected and evaluated in self.Finish
+
+			Parameters
+			----------
+			protSeq : str
+				Sequence of the protein as str
+			protID : str
+				Protein ID
+		"""
+		if self.matrix:
+			return self.engine.Add(protSeq, protID)
+		elif self.occ:
+			return self.UpdateConsensus(self.engine.FindPos(protSeq), protID)
+		else:
+			return self.UpdateConsensus(self.engine.Find(protSeq), protID)
+	#---
+
+	def AddCount(self, protSeq, frag):
+		"""Add a protein to the count of the AAs in the residue numbers
+
+			Parameters
+			----------
+			protSeq : str
+				Sequence of the protein as str
+			frag : bool
+				The protein is a fragment
+		"""
+		return self.aaCount.Add(protSeq, frag)
+	#---
+
+	def UpdateConsensus(self, found, protID):
+		"""Updates the self.seqProt and self.protSeq dict
+
+			Parameters
+			----------
+			found : list of str or dict
+				Consensus sequences found in the protein as returned by
+				self.engine.Find or self.engine.FindPos
+			protID : str
+				Protein ID
+
+			Notes
+			-----
+			Protein IDs are stored as indexes in self.protID and joined only
+			when writing the output.
+		"""
+		#region ------------------------------------------------------> Update
+		if found:
+			#--> Update self.protSeq
+			idx = self.ProteinIndex(protID)
+			self.protSeq[idx].extend(found)
+			#--> Update self.protPos
+			if self.occ:
+				self.protPos[idx].extend(found.values())
+			else:
+				pass
+		else:
+			pass
+		for k in found:
+			#--> Update self.seqProt
+			if k not in self.seqProt:
+				self.seqProt[k] = {'Count':0, 'PerCent':0, 'pID':array('L')}
+			else:
+				pass
+			self.seqProt[k]['Count'] += 1
+			self.seqProt[k]['pID'].append(idx)
+		#endregion ---------------------------------------------------> Update
+
+		return True
+	#---
+
+	def ProteinIndex(self, protID):
+		"""Index of the protein in self.protID. New proteins are added to
+			self.protID, self.protSeq and self.protPos
+
+			Parameters
+			----------
+			protID : str
+				Protein ID
+
+			Returns
+			-------
+			int
+		"""
+		if (idx := self.protIdx.get(protID)) is None:
+			idx = self.protIdx[protID] = len(self.protID)
+			self.protID.append(protID)
+			self.protSeq[idx] = []
+			if self.occ:
+				self.protPos[idx] = []
+			else:
+				pass
+		else:
+			pass
+		return idx
+	#---
+
+	def MergeMatrix(self):
+		"""Add the consensus sequences found by the vectorised evaluation of
+			the residues in self.engine
+		"""
+		for k, n, protID in self.engine.Evaluate():
+			pID = array('L', [self.ProteinIndex(x) for x in protID])
+			self.seqProt[k] = {'Count':n, 'PerCent':0, 'pID':pID}
+			for idx in pID:
+				self.protSeq[idx].append(k)
+		return True
+	#---
+
+	def Finish(self, protsselT):
+		"""Select & sort the results after all proteins were searched
+
+			Parameters
+			----------
+			protsselT : int
+				Number of searched proteins
+		"""
+		#region -------------------------------> Evaluate residues of proteins
+		if self.matrix:
+			self.MergeMatrix()
+		else:
+			pass
+		if self.aaCount is not None:
+			self.aaCountV = self.aaCount.Count()
+		else:
+			pass
+		#endregion ----------------------------> Evaluate residues of proteins
+
+		#region -------------------------------------------------> Total count
+		for v in self.seqProt.values():
+			self.countTotal += v['Count']
+		#endregion ----------------------------------------------> Total count
+
+		#region ------------------------------------------> Select & sort
+		if self.countTotal == 0:
+			pass
+		else:
+			self.SelectResults(protsselT)
+			self.protSeq = {
+				k: self.protSeq[k]
+				for k in sorted(
+					self.protSeq,
+					key = lambda x: self.protID[x],
+				)
+			}
+		#endregion ---------------------------------------> Select & sort
+
+		return True
+	#---
+
+	def SelectResults(self, protsselT):
+		"""Keep in self.seqProt only the sequences to report, sorted by count.
+			With Top sequences, a heap selects the sequences without sorting
+			all of them.
+
+			Parameters
+			----------
+			protsselT : int
+				Number of searched proteins
+		"""
+		#region ------------------------------------------------------> Filter
+		if self.minP is not None:
+			keys = [
+				k for k, v in self.seqProt.items()
+				if 100 * v['Count'] >= self.minP * protsselT
+			]
+		elif self.minC:
+			keys = [k for k, v in self.seqProt.items() if v['Count'] >= self.minC]
+		else:
+			keys = self.seqProt.keys()
+		#endregion ---------------------------------------------------> Filter
+
+		#region --------------------------------------------------------> Sort
+		sortKey = lambda x: (
+			-self.seqProt[x]['Count'],
+			self.Mismatch(x),
+			self.aaRank.Rank(x),
+		)
+		if self.topK is None:
+			keys = sorted(keys, key=sortKey)
+		else:
+			keys = heapq.nsmallest(self.topK, keys, key=sortKey)
+		#endregion -----------------------------------------------------> Sort
+
+		#region -------------------------------------------------> Calculate %
+		self.seqProt = {k: self.seqProt[k] for k in keys}
+		for v in self.seqProt.values():
+			v['PerCent'] = f"{(100 * v['Count'] / protsselT):.2f}"
+		#endregion ----------------------------------------------> Calculate %
+
+		return True
+	#---
+
+	def Mismatch(self, seq):
+		"""Number of positions in which the AA is not allowed
+
+			Parameters
+			----------
+			seq : str
+				Consensus sequence
+
+			Returns
+			-------
+			int
+		"""
+		return sum([aa not in r for r, aa in zip(self.aaRank.rank, seq)])
+	#---
+
+	def WriteResults(self, oFile):
+		"""Write the results to an open file, starting with the number of
+			proteins with a conSeq
+
+			Parameters
+			----------
+			oFile : file object
+				File open for writing
+		"""
+		#region -------------------------------------------------------> Write
+		oFile.write(f"Consensus sequence in proteins\t{len(self.protSeq)}\n")
+
+		#--> Mismatches column only if mismatches are allowed
+		if self.maxMis:
+			header = f'\nCount\tSequence\tMismatches\tPercent\tProtein IDs'
+		else:
+			header = f'\nCount\tSequence\tPercent\tProtein IDs'
+		oFile.write(header+'\n')
+		for k,v in self.seqProt.items():
+			pID = ", ".join([self.protID[x] for x in v['pID']])
+			seq = f"{k}\t{self.Mismatch(k)}" if self.maxMis else k
+			oFile.write(f"{v['Count']}\t{seq}\t{v['PerCent']}\t{pID}\n")
+		#--> conSeqs not found are created here to avoid keeping them in memory
+		if self.zeroC and not self.minC and not self.minP:
+			zeroSeq = (
+				k for v in itertools.product(*self.allAA)
+				if (k := "".join(v)) not in self.seqProt
+			)
+			if self.topK is not None:
+				zeroSeq = itertools.islice(
+					zeroSeq, max(self.topK - len(self.seqProt), 0))
+			else:
+				pass
+			for k in zeroSeq:
+				seq = f"{k}\t0" if self.maxMis else k
+				oFile.write(f"0\t{seq}\t{0:.2f}\t\n")
+		else:
+			pass
+
+		if not self.Pos:
+			oFile.write(f"\nProtein IDs\tSequences\n")
+			for k, v in self.protSeq.items():
+				oFile.write(f"{self.protID[k]}\t{', '.join(v)}\n")
+			oFile.write("\n")
+		else:
+			pass
+
+		if self.occ:
+			#--> 1-based positions
+			oFile.write(f"Protein IDs\tSequence\tOccurrences\tPositions\n")
+			for k, v in self.protSeq.items():
+				for s, p in zip(v, self.protPos[k]):
+					pos = ", ".join([str(x+1) for x in p])
+					oFile.write(f"{self.protID[k]}\t{s}\t{len(p)}\t{pos}\n")
+			oFile.write("\n")
+		else:
+			pass
+
+		if self.aaCountV is not None:
+			aaL = "\t".join(ResidueCount.AA)
+			oFile.write(f"\nProteins\tResidue\t{aaL}\tOther\n")
+			for k, tLabel in enumerate(('Complete', 'Fragment')):
+				for r, c in zip(self.resID, self.aaCountV[k].tolist()):
+					cStr = "\t".join(map(str, c))
+					oFile.write(f"{tLabel}\t{r}\t{cStr}\n")
+		else:
+			pass
+
+		if self.Pos:
+			oFile.write("\n")
+		else:
+			pass
+		#endregion ----------------------------------------------------> Write
+
+		return True
+	#---
+	#endregion ------------------------------------------------> Class methods
+#---
+#endregion ----------------------------------------------------------> Classes
+
+#region -------------------------------------------------------------> Methods
+def ReadPosAA(tStr, posKey, optAA=None):
+	"""Get the list of Positions & AAs configurations
+
+		Parameters
+		----------
+		tStr : str
+			A dict, a list of dicts or the path to a file with a list of dicts
+			or one dict per line
+		posKey : str
+			Key telling if the residue numbers are used. Must be in all dicts
+		optAA : list of str or None
+			Valid one letter AAs. None accepts any single letter
+
+		Returns
+		-------
+		list of dict
+
+		Raises
+		------
+		ValueError
+			If tStr is not valid. The same checks as in the Positions & AAs
+			window are done: the residue numbers must be positive and 
+			increasing if posKey is True and each value must be a 
+			space-separated list of valid AAs
+	"""
+	#region -------------------------------------------------------> Parse
+	try:
+		val = ast.literal_eval(tStr.strip())
+	except EVAL_ERROR:
+		if os.path.isfile(tStr.strip()):
+			with open(tStr.strip(), 'r') as file:
+				text = file.read()
+			try:
+				val = ast.literal_eval(text.strip())
+			except EVAL_ERROR:
+				try:
+					val = [
+						ast.literal_eval(l) for l in text.splitlines()
+						if l.strip() != ''
+					]
+				except EVAL_ERROR:
+					raise ValueError(f'Invalid Positions & AAs in {tStr}')
+		else:
+			raise ValueError(f'Invalid Positions & AAs: {tStr}')
+	#endregion ----------------------------------------------------> Parse
+
+	#region -------------------------------------------------------> Check
+	if isinstance(val, dict):
+		val = [val]
+	elif isinstance(val, (list, tuple)):
+		val = list(val)
+	else:
+		raise ValueError(f'Invalid Positions & AAs: {tStr}')
+	if val and all(
+		isinstance(x, dict) and isinstance(x.get(posKey), bool) and len(x) > 1
+		for x in val
+		):
+		pass
+	else:
+		raise ValueError(f'Invalid Positions & AAs: {tStr}')
+	#--> Content of each dict
+	for x in val:
+		a = 0
+		for k, v in x.items():
+			if k == posKey:
+				continue
+			else:
+				pass
+			#--> Residue numbers
+			if x[posKey]:
+				if type(k) != int or k <= a:
+					raise ValueError(
+						f'Residue numbers must be positive integers in '
+						f'increasing order: {x}')
+				else:
+					a = k
+			else:
+				pass
+			#--> AAs
+			if not (
+				isinstance(v, str) 
+				and (aa := v.split())
+				and all(
+					(len(y) == 1 and y.isalpha()) if optAA is None 
+					else y in optAA 
+					for y in aa
+				)):
+				raise ValueError(f'Invalid AAs {v!r} in: {x}')
+			else:
+				pass
+	#endregion ----------------------------------------------------> Check
+
+	return val
+#---
+#endregion ----------------------------------------------------------> Methods
+
+#region -------------------------------------------------------> Process pool
+workerEngine = None # Search engines of the worker process. Set in InitWorker
+
+def InitWorker(engine):
+	"""Set the search engines of a worker process
+
+		Parameters
+		----------
+		engine : list
+			Search engines, e.g. AhoCorasick, PatternLoop, RegexClass or 
+			ShiftAnd. One for each configuration searched in the pool
+	"""
+	global workerEngine
+	workerEngine = engine
+	return True
+#---
+
+def FindShard(shard, pos=False):
+	"""Search the consensus sequences in a group of proteins
+
+		Parameters
+		----------
+		shard : list of str
+			Protein sequences
+		pos : bool
+			Get also the start positions of the consensus sequences
+
+		Returns
+		-------
+		list of list
+			For each engine in workerEngine, the consensus sequences found in 
+			each protein, as returned by Find or FindPos
+	"""
+	if pos:
+		return [[e.FindPos(seq) for seq in shard] for e in workerEngine]
+	else:
+		return [[e.Find(seq) for seq in shard] for e in workerEngine]
+#---
+
+def FindRecords(records, pos=False):
+	"""Search the consensus sequences in the proteins of a byte range of the
+		fasta file. work for data.fasta.FastaRangeReader
+
+		Parameters
+		----------
+		records : iterable of data.fasta.FastaRecord
+			Proteins
+		pos : bool
+			Get also the start positions of the consensus sequences
+
+		Returns
+		-------
+		tuple
+			(Protein IDs, result of FindShard)
+	"""
+	protID  = []
+	protSeq = []
+	for r in records:
+		protID.append(r.accession)
+		protSeq.append(r.sequence)
+	return (protID, FindShard(protSeq, pos))
+#---
+#endregion ----------------------------------------------------> Process pool
@@ -0,0 +1,1789 @@
+# ------------------------------------------------------------------------------
+# Author: Kenny Bravo Rodriguez 2019 (kenny.bravorodriguez@mpi-dortmund.mpg.de)
+#
+# Copyright (c) 2019 Max Planck Institute of Molecular Physiology
+#
+# This complete copyright notice must be included in any revised version of the
+# source code. Additional authorship citations may be added, but existing
+# author citations must be preserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ------------------------------------------------------------------------------
+
+"""Read fasta files. Nothing in this module depends on wxPython.
+
+	The file is read in large blocks and split into records at the '\\n>'
+	boundaries, so there is no Python code running for each line.
+	FastaMmapReader does the same over a memory-mapped file and keeps the 
+	sequences as bytes until they are used. Compressed files are read with 
+	data.compress. FastaIndex saves the position of each protein next to the
+	fasta file to read only some proteins in later runs. WriteStore converts
+	a fasta file into a binary protein store that StoreReader reads without
+	parsing.
+"""
+
+#region -------------------------------------------------------------> Imports
+import bisect
+import glob
+import hashlib
+import json
+import mmap
+import os
+import re
+import sys
+from array import array
+from pathlib import Path
+
+import data.compress as pstCompress
+#endregion ----------------------------------------------------------> Imports
+
+#region -----------------------------------------------------------> VARIABLES
+UNIPROT = re.compile( # UniProt header, see UniProtHeader. A field ends before
+	# the next ' XX=' 
+	r'>(?P<db>[^|\s]+)\|(?P<accession>[^|\s]+)\|(?P<entry>\S+)'
+	r'(?: (?!\w\w=)(?P<name>(?:(?! \w\w=).)*))?'
+	r'(?: OS=(?P<os>(?:(?! \w\w=).)*))?'
+	r'(?: OX=(?P<ox>\d+))?'
+	r'(?: GN=(?P<gn>\S+))?'
+	r'(?: PE=(?P<pe>\d))?'
+	r'(?: SV=(?P<sv>\d+))?'
+	r'\s*$'
+)
+STORE         = b'PSTSTORE' # First bytes of a protein store, see WriteStore
+STORE_VERSION = 1
+#endregion --------------------------------------------------------> VARIABLES
+
+#region -------------------------------------------------------------> Classes
+class FastaRecord():
+	"""One protein in a fasta file
+
+		Parameters
+		----------
+		header : str
+			Header line, including the '>'
+		sequence : str or None
+			Sequence of the protein
+		raw : str, bytes-like or None
+			Sequence lines as read from the file. sequence is created from it
+			the first time it is used
+
+		Attributes
+		----------
+		header : str
+			Header line, including the '>'
+		accession : str
+			Protein ID, e.g. P31946 in >sp|P31946|1433B_HUMAN
+		gene : str or None
+			Value of GN= in the header or None if there is no GN=. accession 
+			and gene are taken from uniprot the first time they are used
+		fragment : bool
+			The word Fragment is in the header
+		uniprot : UniProtHeader
+			Fields in the header, as returned by ParseHeader. Set on first use
+			or by the select step, e.g. SelectGene
+		sequence : str or None
+			Sequence of the protein. None if the sequence is not needed
+		raw : str, bytes-like or None
+			Sequence lines not yet joined into sequence
+		offset : int
+			Position of the '>' in the file. Only set by FastaMmapReader
+		length : int
+			Number of bytes of the protein in the file, without the last new
+			line. Only set by FastaMmapReader
+	"""
+	__slots__ = (
+		'header', 'accession', 'gene', 'fragment', 'uniprot', 'sequence', 'raw',
+		'offset', 'length',
+	)
+
+	#region --------------------------------------------------> Instance setup
+	def __init__(self, header, sequence=None, raw=None):
+		"""accession, gene and sequence from raw are set on first use in 
+			__getattr__
+		"""
+		self.header   = header
+		self.fragment = 'Fragment' in header
+		if sequence is not None:
+			self.sequence = sequence
+		elif raw is not None:
+			self.raw = raw
+		else:
+			pass
+	#---
+	#endregion -----------------------------------------------> Instance setup
+
+	#region ---------------------------------------------------> Class methods
+	def __getattr__(self, name):
+		"""Parse accession, gene & uniprot from the header and join the 
+			sequence lines in raw. Only called while the slot is empty
+
+			Parameters
+			----------
+			name : str
+				Attribute name
+		"""
+		#region ------------------------------------------> Accession & Gene
+		if name == 'accession':
+			self.accession = self.uniprot.accession
+			return self.accession
+		elif name == 'gene':
+			self.gene = self.uniprot.gene
+			return self.gene
+		elif name == 'uniprot':
+			self.uniprot = ParseHeader(self.header)
+			return self.uniprot
+		else:
+			pass
+		#endregion ---------------------------------------> Accession & Gene
+
+		#region ----------------------------------------------------> Sequence
+		if name == 'sequence':
+			try:
+				self.sequence = JoinLines(self.raw)
+			except AttributeError:
+				return None
+			del self.raw
+			return self.sequence
+		else:
+			pass
+		#endregion -------------------------------------------------> Sequence
+
+		raise AttributeError(name)
+	#---
+
+	def Prefix(self, n):
+		"""First n residues of the sequence. If the sequence was not built 
+			yet, only the start of raw is joined, so the sequence lines after
+			the first n residues are not read
+
+			Parameters
+			----------
+			n : int
+				Number of residues
+
+			Returns
+			-------
+			str or None
+				None if the sequence is not available
+		"""
+		#region ------------------------------------------------> Sequence
+		try:
+			raw = self.raw
+		except AttributeError:
+			seq = self.sequence
+			return None if seq is None else seq[0:n]
+		#endregion ---------------------------------------------> Sequence
+
+		#region -----------------------------------------------------> Raw
+		#--> Room for the new lines of ~60 residues per line, doubled if 
+		#--> the lines are shorter
+		k = n + n // 32 + 16
+		while True:
+			seq = JoinLines(raw[0:k])
+			if len(seq) >= n or k >= len(raw):
+				return seq[0:n]
+			else:
+				k *= 2
+		#endregion --------------------------------------------------> Raw
+	#---
+
+	def __reduce__(self):
+		"""Pickle only the header and the sequence, e.g. to return the 
+			record from a process pool. raw cannot be pickled
+		"""
+		return (FastaRecord, (self.header, self.sequence))
+	#---
+	#endregion ------------------------------------------------> Class methods
+#---
+
+class UniProtHeader():
+	"""Fields in a UniProt fasta header, e.g.
+		>sp|P31946|1433B_HUMAN 14-3-3 protein beta/alpha OS=Homo sapiens 
+		OX=9606 GN=YWHAB PE=1 SV=3
+
+		Parameters
+		----------
+		header : str
+			Header line, including the '>'
+
+		Attributes
+		----------
+		header : str
+			Header line, including the '>'
+		db : str or None
+			sp or tr
+		accession : str
+			Protein ID, e.g. P31946
+		entry : str or None
+			Entry name, e.g. 1433B_HUMAN
+		name : str or None
+			Protein name
+		organism : str or None
+			OS, organism name
+		taxID : int or None
+			OX, organism ID
+		gene : str or None
+			GN, gene name
+		evidence : int or None
+			PE, protein existence
+		version : int or None
+			SV, sequence version
+		fragment : bool
+			The word Fragment is in the header
+
+		Notes
+		-----
+		accession and gene are taken with HeaderAccession and HeaderGene, so 
+		they are also set if the header does not follow the UniProt format. 
+		The other fields are parsed with UNIPROT the first time one of them is
+		used and are None if the header does not follow the UniProt format.
+	"""
+	__slots__ = (
+		'header', 'db', 'accession', 'entry', 'name', 'organism', 'taxID', 
+		'gene', 'evidence', 'version', 'fragment',
+	)
+
+	#region --------------------------------------------------> Instance setup
+	def __init__(self, header):
+		"""Fields are set on first use in __getattr__"""
+		self.header = header
+	#---
+	#endregion -----------------------------------------------> Instance setup
+
+	#region ---------------------------------------------------> Class methods
+	def __getattr__(self, name):
+		"""Parse the fields of the header. Only called while the slot is 
+			empty
+
+			Parameters
+			----------
+			name : str
+				Attribute name
+		"""
+		if name == 'accession':
+			self.accession = HeaderAccession(self.header)
+			return self.accession
+		elif name == 'gene':
+			self.gene = HeaderGene(self.header)
+			return self.gene
+		elif name == 'fragment':
+			self.fragment = 'Fragment' in self.header
+			return self.fragment
+		elif name in ('db', 'entry', 'name', 'organism', 'taxID', 'evidence', 
+			'version'):
+			self.Parse()
+			return getattr(self, name)
+		else:
+			raise AttributeError(name)
+	#---
+
+	def Parse(self):
+		"""Set the fields other than accession, gene and fragment"""
+		match = UNIPROT.match(self.header)
+		if match is None:
+			self.db       = None
+			self.entry    = None
+			self.name     = None
+			self.organism = None
+			self.taxID    = None
+			self.evidence = None
+			self.version  = None
+		else:
+			db, _, entry, name, org, ox, _, pe, sv = match.groups()
+			self.db       = db
+			self.entry    = entry
+			self.name     = name
+			self.organism = org
+			self.taxID    = None if ox is None else int(ox)
+			self.evidence = None if pe is None else int(pe)
+			self.version  = None if sv is None else int(sv)
+	#---
+	#endregion ------------------------------------------------> Class methods
+#---
+
+class FastaReader():
+	"""Iterate over the proteins in a fasta file
+
+		Parameters
+		----------
+		fFile : str or Path
+			Path to the fasta file. It can be compressed
+		select : callable or None
+			Called with each FastaRecord before building its sequence. Only
+			the records for which it returns True are yielded. None yields all
+			records
+		progress : callable or None
+			Called with the reader after each block of the file
+		blockSize : int
+			Number of characters read at once
+
+		Attributes
+		----------
+		ltotal : int
+			Number of lines read so far
+		lempty : int
+			Number of empty lines read so far
+		prottotal : int
+			Number of proteins read so far
+		protfrag : int
+			Number of proteins with Fragment in the header read so far
+
+		Notes
+		-----
+		Lines before the first header are counted but not yielded. Lines with
+		only spaces are not counted as empty. The counters are complete only 
+		after the iteration finishes.
+	"""
+	#region --------------------------------------------------> Instance setup
+	def __init__(self, fFile, select=None, progress=None, blockSize=1<<20):
+		""""""
+		self.fFile     = fFile
+		self.select    = select
+		self.progress  = progress
+		self.blockSize = blockSize
+		#--> Counters
+		self.ltotal    = 0
+		self.lempty    = 0
+		self.prottotal = 0
+		self.protfrag  = 0
+	#---
+	#endregion -----------------------------------------------> Instance setup
+
+	#region ---------------------------------------------------> Class methods
+	def __iter__(self):
+		"""Yield the FastaRecord of the selected proteins"""
+		#region --------------------------------------------------------> Read
+		rest  = ''
+		first = True
+		with pstCompress.Open(self.fFile, 'r') as file:
+			while block := file.read(self.blockSize):
+				block = rest + block
+				#--> Keep the last record, it may continue in the next block
+				if (end := block.rfind('\n>')) > -1:
+					yield from self.Records(block[0:end], first)
+					rest  = block[end+1:]
+					first = False
+				else:
+					rest = block
+				if self.progress is not None:
+					self.progress(self)
+				else:
+					pass
+			#--> Last record
+			if rest:
+				yield from self.Records(
+					rest[0:-1] if rest[-1] == '\n' else rest, first)
+			else:
+				pass
+		#endregion -----------------------------------------------------> Read
+	#---
+
+	def Records(self, text, first=False):
+		"""Yield the FastaRecord of the selected proteins in text
+
+			Parameters
+			----------
+			text : str
+				Complete records separated by '\\n>'
+			first : bool
+				text is the start of the file and may have lines before the
+				first header
+		"""
+		#region ------------------------------------------------------> Lines
+		self.ltotal += text.count('\n') + 1
+		if (not text or '\n\n' in text or text[0] == '\n' 
+			or text[-1] == '\n'):
+			self.lempty += text.split('\n').count('')
+		else:
+			pass
+		#endregion ---------------------------------------------------> Lines
+
+		#region -----------------------------------------------------> Records
+		select = self.select
+		start  = 0
+		nProt  = 0
+		nFrag  = 0
+		#--> Lines before the first header
+		if first and text[0:1] != '>':
+			if (start := text.find('\n>')) == -1:
+				return
+			else:
+				start += 1
+		else:
+			pass
+		#--> Proteins, text[start] is always '>'
+		try:
+			while start > -1:
+				end = text.find('\n', start)
+				if end == -1:
+					end = len(text)
+				else:
+					pass
+				#--> '>' is rare, so this is faster than searching '\n>'
+				nxt = text.find('>', end)
+				while nxt > -1 and text[nxt-1] != '\n':
+					nxt = text.find('>', nxt+1)
+				record = FastaRecord(text[start:end].rstrip())
+				nProt += 1
+				nFrag += record.fragment
+				if select is None or select(record):
+					record.raw = (
+						text[end+1:] if nxt == -1 else text[end+1:nxt-1])
+					yield record
+				else:
+					pass
+				start = nxt
+		finally:
+			self.prottotal += nProt
+			self.protfrag  += nFrag
+		#endregion --------------------------------------------------> Records
+	#---
+	#endregion ------------------------------------------------> Class methods
+#---
+
+class FastaMmapReader(FastaReader):
+	"""Iterate over the proteins in a memory-mapped fasta file. The file is
+		processed as bytes. Only the headers are decoded to str and the 
+		sequences are kept as memoryview slices of the file blocks until the
+		sequence of a selected protein is used.
+
+		Parameters
+		----------
+		fFile : str or Path
+			Path to the fasta file
+		select : callable or None
+			Called with each FastaRecord. Only the records for which it returns
+			True are yielded. None yields all records
+		progress : callable or None
+			Called with the reader after each block of the file
+		blockSize : int
+			Minimum number of bytes in each block. Blocks end at the start of a
+			protein
+		start : int
+			Read the file from this position. It must be 0 or the position of
+			the '>' of a protein
+		stop : int or None
+			Read the file up to this position. It must be the position of the
+			'>' of a protein or None to read until the end of the file
+
+		Attributes
+		----------
+		start : int
+			Read the file from this position
+		stop : int or None
+			Read the file up to this position
+		blockStart : int
+			Position in the file of the block being processed. Used to set
+			FastaRecord.offset
+
+		Notes
+		-----
+		Headers are decoded as UTF-8 and sequences as latin-1. The counters of
+		consecutive ranges of the file add up to the counters of the file.
+	"""
+	#region --------------------------------------------------> Instance setup
+	def __init__(
+		self, fFile, select=None, progress=None, blockSize=1<<20, start=0,
+		stop=None,
+		):
+		""""""
+		super().__init__(
+			fFile, select=select, progress=progress, blockSize=blockSize)
+		self.start = start
+		self.stop  = stop
+	#---
+	#endregion -----------------------------------------------> Instance setup
+
+	#region ---------------------------------------------------> Class methods
+	def __iter__(self):
+		"""Yield the FastaRecord of the selected proteins"""
+		#region --------------------------------------------------------> Read
+		with open(self.fFile, 'rb') as file:
+			size = os.fstat(file.fileno()).st_size
+			if size == 0:
+				return
+			else:
+				pass
+			size = size if self.stop is None else self.stop
+			with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+				a     = self.start
+				first = a == 0
+				self.blockStart = a
+				while a < size:
+					#--> The block ends before the '>' of the next protein
+					b = mm.find(b'\n>', min(a + self.blockSize, size) - 1, size)
+					if b == -1:
+						#--> Last block, without the final new line
+						b = size
+						text = mm[a:b-1] if mm[b-1] == 10 else mm[a:b]
+					else:
+						text = mm[a:b]
+					yield from self.Records(text, first)
+					a     = b + 1
+					self.blockStart = a
+					first = False
+					if self.progress is not None:
+						self.progress(self)
+					else:
+						pass
+		#endregion -----------------------------------------------------> Read
+	#---
+
+	def Records(self, text, first=False):
+		"""Yield the FastaRecord of the selected proteins in text
+
+			Parameters
+			----------
+			text : bytes
+				Complete records separated by b'\\n>'
+			first : bool
+				text is the start of the file and may have lines before the
+				first header
+		"""
+		#region ------------------------------------------------------> Lines
+		self.ltotal += text.count(b'\n') + 1
+		#--> b'\r' is searched faster than b'\n\r\n' and is rare
+		if (not text or b'\n\n' in text 
+			or (b'\r' in text and b'\n\r\n' in text)
+			or text[0] in (10, 13) or text[-1] in (10, 13)):
+			tList = text.split(b'\n')
+			self.lempty += tList.count(b'') + tList.count(b'\r')
+		else:
+			pass
+		#endregion ---------------------------------------------------> Lines
+
+		#region -----------------------------------------------------> Records
+		select = self.select
+		view   = memoryview(text)
+		start  = 0
+		nProt  = 0
+		nFrag  = 0
+		#--> Lines before the first header
+		if first and text[0:1] != b'>':
+			if (start := text.find(b'\n>')) == -1:
+				return
+			else:
+				start += 1
+		else:
+			pass
+		#--> Proteins, text[start] is always '>'
+		try:
+			while start > -1:
+				end = text.find(b'\n', start)
+				if end == -1:
+					end = len(text)
+				else:
+					pass
+				#--> '>' is rare, so this is faster than searching '\n>'
+				nxt = text.find(b'>', end)
+				while nxt > -1 and text[nxt-1] != 10: # 10 is '\n'
+					nxt = text.find(b'>', nxt+1)
+				record = FastaRecord(
+					text[start:end].decode('utf-8', 'replace').rstrip())
+				nProt += 1
+				nFrag += record.fragment
+				if select is None or select(record):
+					stop          = len(text) if nxt == -1 else nxt - 1
+					record.raw    = view[end+1:stop]
+					record.offset = self.blockStart + start
+					record.length = stop - start
+					yield record
+				else:
+					pass
+				start = nxt
+		finally:
+			self.prottotal += nProt
+			self.protfrag  += nFrag
+		#endregion --------------------------------------------------> Records
+	#---
+	#endregion ------------------------------------------------> Class methods
+#---
+
+class FastaIndex():
+	"""Sidecar index of a plain fasta file with the position of each protein
+		in the file, its accession, gene and fragment flag. The index is saved
+		next to the fasta file, e.g. uniprot.fasta.pstidx, and the proteins of
+		a list of genes or accessions are then read without scanning the file.
+
+		Parameters
+		----------
+		fFile : str or Path
+			Path to the fasta file. It must be a plain, uncompressed file
+		progress : callable or None
+			Called with the reader after each block of the file while the 
+			index is built
+		blockSize : int
+			Minimum number of bytes in each block while the index is built
+
+		Attributes
+		----------
+		fFile : Path
+			Path to the fasta file
+		iFile : Path
+			Path to the index file
+		progress : callable or None
+			Called with the reader after each block of the file
+		blockSize : int
+			Minimum number of bytes in each block
+		stamp : list or None
+			Size, modification time and hash of the fasta file
+		mm : mmap.mmap or None
+			Map of the index file while it is loaded
+		section : dict
+			Sections of the mapped index file, as memoryview. Empty if the 
+			index was built
+		offset : sequence of int
+			Position of the '>' of each protein in the file
+		length : sequence of int
+			Number of bytes of each protein, see FastaRecord.length
+		fragment : sequence of int
+			1 if the protein is a fragment
+		accession : list of str or None
+			Accession of each protein. None until Accession is used after Load
+		gene : dict
+			Gene name as key and the number of its proteins as value while 
+			the index is built, e.g. {'YWHAB': [0, 7]}. Save moves it to 
+			geneName, geneStart and geneProt
+		geneName : list of str or None
+			Sorted gene names. None until Gene is used after Load
+		geneStart : sequence of int
+			Start of the proteins of each gene in geneProt plus the end of the
+			last one
+		geneProt : sequence of int
+			Number of the proteins of each gene, e.g. the proteins of 
+			geneName[i] are geneProt[geneStart[i]:geneStart[i+1]]
+		ltotal, lempty, prottotal, protfrag : int
+			Same as in FastaReader, for the whole file
+
+		Notes
+		-----
+		The index is valid while the size, the modification time and the hash
+		of the fasta file do not change. The hash only covers NSAMPLE blocks
+		spread over the file, so checking the index does not read the whole
+		file.
+
+		The index file has the same layout as a protein store, see WriteStore.
+		It starts with MAGIC and has the sections Offset, Length, GeneStart 
+		and GeneProt (int64), Fragment (one byte per protein), Accession and
+		Gene (UTF-8 columns, one line per protein or gene). Load maps the file
+		and the fixed-width sections are read from the map when needed. The
+		columns are decoded the first time Accession or Gene is used.
+	"""
+	#region -----------------------------------------------------> Class setup
+	EXT     = '.pstidx'
+	MAGIC   = b'PSTINDEX'
+	VERSION = 2
+	SAMPLE  = 1 << 16
+	NSAMPLE = 8
+	#endregion --------------------------------------------------> Class setup
+
+	#region --------------------------------------------------> Instance setup
+	def __init__(self, fFile, progress=None, blockSize=1<<20):
+		""""""
+		self.fFile     = Path(fFile)
+		self.iFile     = self.fFile.with_name(self.fFile.name + self.EXT)
+		self.progress  = progress
+		self.blockSize = blockSize
+		self.mm        = None
+		self.Clear()
+	#---
+	#endregion -----------------------------------------------> Instance setup
+
+	#region ---------------------------------------------------> Class methods
+	def Clear(self, stamp=None):
+		"""Empty the index, e.g. before the parts of the index are added with
+			Extend. The index file is unmapped
+
+			Parameters
+			----------
+			stamp : list or None
+				Stamp of the fasta file, as returned by Stamp
+		"""
+		self.Close()
+		self.stamp     = stamp
+		#--> Counters
+		self.ltotal    = 0
+		self.lempty    = 0
+		self.prottotal = 0
+		self.protfrag  = 0
+	#---
+
+	def Close(self):
+		"""Unmap the index file mapped by Load and empty the proteins of the
+			index. The counters are kept. The index file can then be replaced,
+			e.g. by Save
+		"""
+		#region -------------------------------------------------------> Unmap
+		if self.mm is not None:
+			for v in (
+				self.offset, self.length, self.fragment, self.geneStart, 
+				self.geneProt, *self.section.values(),
+				):
+				if isinstance(v, memoryview):
+					v.release()
+				else:
+					pass
+			self.mm.close()
+			self.mm = None
+		else:
+			pass
+		#endregion ----------------------------------------------------> Unmap
+
+		#region ----------------------------------------------------> Proteins
+		self.section   = {}
+		self.offset    = array('q')
+		self.length    = array('q')
+		self.fragment  = bytearray()
+		self.accession = []
+		self.gene      = {}
+		self.geneName  = []
+		self.geneStart = array('q', [0])
+		self.geneProt  = array('q')
+		#endregion -------------------------------------------------> Proteins
+	#---
+
+	def Stamp(self):
+		"""Size, modification time and hash of the fasta file
+
+			Returns
+			-------
+			list
+				[size, mtime in ns, hex digest]
+		"""
+		stat = os.stat(self.fFile)
+		size = stat.st_size
+		h    = hashlib.blake2b(digest_size=16)
+		with open(self.fFile, 'rb') as file:
+			for k in range(self.NSAMPLE):
+				file.seek(max(0, size-self.SAMPLE) * k // (self.NSAMPLE-1))
+				h.update(file.read(self.SAMPLE))
+		return [size, stat.st_mtime_ns, h.hexdigest()]
+	#---
+
+	def Load(self):
+		"""Map the index file. The map is kept until Close or Clear
+
+			Returns
+			-------
+			bool
+				False if there is no index or the fasta file changed
+		"""
+		#region --------------------------------------------------------> Read
+		self.Clear(self.Stamp())
+		try:
+			with open(self.iFile, 'rb') as file:
+				mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+		except (OSError, ValueError):
+			return False
+		try:
+			if mm[0:len(self.MAGIC)] != self.MAGIC:
+				raise ValueError(self.iFile)
+			else:
+				pass
+			n    = int.from_bytes(mm[-8:], 'little')
+			meta = json.loads(mm[-8-n:-8])
+		except ValueError:
+			mm.close()
+			return False
+		#endregion -----------------------------------------------------> Read
+
+		#region -------------------------------------------------------> Check
+		if meta.get('Version') != self.VERSION or meta.get('Stamp') != self.stamp:
+			mm.close()
+			return False
+		else:
+			pass
+		#endregion ----------------------------------------------------> Check
+
+		#region ---------------------------------------------------> Variables
+		self.mm = mm
+		view    = memoryview(mm)
+		self.section = {k: view[a:a+n] for k, (a, n) in meta['Section'].items()}
+		for k in ('Offset', 'Length', 'GeneStart', 'GeneProt'):
+			if meta['ByteOrder'] == sys.byteorder:
+				v = self.section[k].cast('q')
+			else:
+				v = array('q', self.section[k])
+				v.byteswap()
+			setattr(self, k[0].lower()+k[1:], v)
+		self.fragment  = self.section['Fragment']
+		self.accession = None
+		self.geneName  = None
+		self.ltotal, self.lempty, self.prottotal, self.protfrag = meta['Count']
+		#endregion ------------------------------------------------> Variables
+
+		return True
+	#---
+
+	def Build(self):
+		"""Index the fasta file and save the index. The file is read once and
+			all proteins are yielded while they are indexed, so the caller 
+			can use them. The index is saved only if all proteins are read
+
+			Yields
+			------
+			FastaRecord
+		"""
+		self.Clear(self.Stamp())
+		part   = IndexPart()
+		reader = FastaMmapReader(
+			self.fFile, progress=self.progress, blockSize=self.blockSize)
+		yield from part.Add(reader)
+		self.Extend(part)
+		self.Save()
+	#---
+
+	def Extend(self, part):
+		"""Add the proteins of a part of the fasta file. The parts must be 
+			added in the order of the file, after Clear. Save completes the 
+			index
+
+			Parameters
+			----------
+			part : IndexPart
+				Proteins of the part
+		"""
+		#region ----------------------------------------------------> Proteins
+		n0 = len(self.offset)
+		self.offset.extend(part.offset)
+		self.length.extend(part.length)
+		self.fragment.extend(part.fragment)
+		self.accession.extend(part.accession)
+		for n, g in enumerate(part.gene, start=n0):
+			if g is not None:
+				self.gene.setdefault(g, []).append(n)
+			else:
+				pass
+		#endregion -------------------------------------------------> Proteins
+
+		#region ----------------------------------------------------> Counters
+		self.ltotal    += part.count[0]
+		self.lempty    += part.count[1]
+		self.prottotal += part.count[2]
+		self.protfrag  += part.count[3]
+		#endregion -------------------------------------------------> Counters
+	#---
+
+	def Save(self):
+		"""Sort the genes and save the index file
+
+			Returns
+			-------
+			bool
+				False if the index file cannot be written, e.g. the folder is
+				read-only. The index is then only kept in memory
+		"""
+		#region -------------------------------------------------------> Genes
+		self.geneName  = sorted(self.gene)
+		self.geneStart = array('q', [0])
+		self.geneProt  = array('q')
+		for g in self.geneName:
+			self.geneProt.extend(self.gene[g])
+			self.geneStart.append(len(self.geneProt))
+		self.gene = {}
+		#endregion ----------------------------------------------------> Genes
+
+		#region -------------------------------------------------------> Write
+		tmp     = self.iFile.with_name(self.iFile.name + '.tmp')
+		section = {}
+		try:
+			with open(tmp, 'wb') as file:
+				file.write(self.MAGIC)
+				for k, v in (
+					('Offset'   , self.offset.tobytes()),
+					('Length'   , self.length.tobytes()),
+					('GeneStart', self.geneStart.tobytes()),
+					('GeneProt' , self.geneProt.tobytes()),
+					('Fragment' , self.fragment),
+					('Accession', '\n'.join(self.accession).encode('utf-8')),
+					('Gene'     , '\n'.join(self.geneName).encode('utf-8')),
+					):
+					file.write(b'\0' * (-file.tell() % 8))
+					section[k] = [file.tell(), len(v)]
+					file.write(v)
+				meta = json.dumps({
+					'Version'  : self.VERSION,
+					'ByteOrder': sys.byteorder,
+					'Stamp'    : self.stamp,
+					'Count'    : [
+						self.ltotal, self.lempty, self.prottotal, 
+						self.protfrag,
+					],
+					'Section'  : section,
+				}).encode('utf-8')
+				file.write(meta)
+				file.write(len(meta).to_bytes(8, 'little'))
+			os.replace(tmp, self.iFile)
+		except OSError:
+			return False
+		#endregion ----------------------------------------------------> Write
+
+		return True
+	#---
+
+	def Records(self, idx):
+		"""Read proteins from the fasta file
+
+			Parameters
+			----------
+			idx : iterable of int
+				Number of the proteins in the file
+
+			Yields
+			------
+			FastaRecord
+		"""
+		if not len(self.offset):
+			return
+		else:
+			pass
+		with open(self.fFile, 'rb') as file:
+			with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+				for n in idx:
+					a    = self.offset[n]
+					text = mm[a:a+self.length[n]]
+					if (end := text.find(b'\n')) == -1:
+						end = len(text)
+					else:
+						pass
+					record = FastaRecord(
+						text[0:end].decode('utf-8', 'replace').rstrip(),
+						raw = memoryview(text)[end+1:],
+					)
+					record.offset = a
+					record.length = self.length[n]
+					yield record
+	#---
+
+	def Gene(self, genes, fold=False):
+		"""Read the proteins of the given genes, in the order of the file
+
+			Parameters
+			----------
+			genes : iterable of str
+				Gene names, as returned by GeneKey
+			fold : bool
+				Compare the gene names ignoring the case
+
+			Yields
+			------
+			FastaRecord
+		"""
+		#region -------------------------------------------------------> Genes
+		if self.geneName is None:
+			self.geneName = Column(self.section['Gene'])
+		else:
+			pass
+		name  = self.geneName
+		genes = set(genes)
+		if fold:
+			pos = [i for i, g in enumerate(name) if GeneKey(g, fold) in genes]
+		else:
+			pos = []
+			for g in genes:
+				i = bisect.bisect_left(name, g)
+				if i < len(name) and name[i] == g:
+					pos.append(i)
+				else:
+					pass
+		#endregion ----------------------------------------------------> Genes
+
+		#region ----------------------------------------------------> Proteins
+		idx = sorted(
+			n for i in pos 
+			for n in self.geneProt[self.geneStart[i]:self.geneStart[i+1]]
+		)
+		yield from self.Records(idx)
+		#endregion -------------------------------------------------> Proteins
+	#---
+
+	def Accession(self, accessions):
+		"""Read the proteins with the given accessions, in the order of the 
+			file
+
+			Parameters
+			----------
+			accessions : iterable of str
+				Protein accessions
+
+			Yields
+			------
+			FastaRecord
+		"""
+		if self.accession is None:
+			self.accession = Column(self.section['Accession'])
+		else:
+			pass
+		accessions = set(accessions)
+		yield from self.Records(
+			n for n, x in enumerate(self.accession) if x in accessions)
+	#---
+	#endregion ------------------------------------------------> Class methods
+#---
+
+class IndexPart():
+	"""Proteins of a part of a fasta file for FastaIndex, e.g. a range read
+		in a worker of FastaRangeReader
+
+		Attributes
+		----------
+		offset, length : array
+			Same as in FastaIndex
+		fragment : bytearray
+			Same as in FastaIndex
+		accession : list of str
+			Accession of each protein
+		gene : list of str or None
+			Gene of each protein
+		count : list of int
+			[ltotal, lempty, prottotal, protfrag] of the part
+
+		Methods
+		-------
+		Add(reader)
+			Index the proteins of a FastaMmapReader
+	"""
+	__slots__ = ('offset', 'length', 'fragment', 'accession', 'gene', 'count')
+
+	#region --------------------------------------------------> Instance setup
+	def __init__(self):
+		""""""
+		self.offset    = array('q')
+		self.length    = array('q')
+		self.fragment  = bytearray()
+		self.accession = []
+		self.gene      = []
+		self.count     = [0, 0, 0, 0]
+	#---
+	#endregion -----------------------------------------------> Instance setup
+
+	#region ---------------------------------------------------> Class methods
+	def Add(self, reader):
+		"""Index the proteins of a reader while they are read
+
+			Parameters
+			----------
+			reader : FastaMmapReader
+				Reader of the part. FastaMmapReader sets the offset and the 
+				length of the records
+
+			Yields
+			------
+			FastaRecord
+		"""
+		for record in reader:
+			self.offset.append(record.offset)
+			self.length.append(record.length)
+			self.fragment.append(record.fragment)
+			self.accession.append(record.accession)
+			self.gene.append(record.gene)
+			yield record
+		self.count = [
+			reader.ltotal, reader.lempty, reader.prottotal, reader.protfrag]
+	#---
+	#endregion ------------------------------------------------> Class methods
+#---
+
+class FastaRangeReader():
+	"""Parse plain fasta files in byte ranges in a process pool. The ranges
+		start at the '>' of a protein and each one is read in a worker with a
+		FastaMmapReader. The worker returns work(reader) and only this result
+		is sent back, so work can reduce the proteins to what the caller needs
+
+		Parameters
+		----------
+		fFile : str, Path or list
+			Path to the fasta file or list of paths. The ranges of all files
+			are sent to the pool at once. They must be plain, uncompressed 
+			files
+		pool : concurrent.futures.Executor
+			Process pool
+		work : callable
+			Called in the worker with the FastaMmapReader of the range. The 
+			default returns the list of FastaRecord
+		select : callable or None
+			Same as in FastaReader
+		progress : callable or None
+			Called with the reader after each range
+		blockSize : int
+			Minimum number of bytes in each block of a range
+		rangeSize : int
+			Minimum number of bytes in each range
+
+		Attributes
+		----------
+		ranges : list of tuple
+			File, start and stop of each range
+		source : Path or None
+			File of the last yielded result
+		ltotal, lempty, prottotal, protfrag : int
+			Same as in FastaReader, for all files
+
+		Notes
+		-----
+		work and select are sent to the worker, so they must be defined at 
+		module level, e.g. SelectGene or a functools.partial of it. The 
+		results are yielded in the order of the ranges in the files.
+	"""
+	#region --------------------------------------------------> Instance setup
+	def __init__(
+		self, fFile, pool, work=list, select=None, progress=None, 
+		blockSize=1<<20, rangeSize=1<<24,
+		):
+		""""""
+		self.fFile     = fFile if isinstance(fFile, list) else [fFile]
+		self.pool      = pool
+		self.work      = work
+		self.select    = select
+		self.progress  = progress
+		self.blockSize = blockSize
+		self.rangeSize = rangeSize
+		self.ranges    = []
+		self.source    = None
+		#--> Counters
+		self.ltotal    = 0
+		self.lempty    = 0
+		self.prottotal = 0
+		self.protfrag  = 0
+	#---
+	#endregion -----------------------------------------------> Instance setup
+
+	#region ---------------------------------------------------> Class methods
+	def __iter__(self):
+		"""Yield the result of work for each range"""
+		#region -----------------------------------------------------> Submit
+		self.ranges = [
+			(f, a, b) for f in self.fFile for a, b in Ranges(f, self.rangeSize)]
+		future = [
+			self.pool.submit(
+				ParseRange, f, a, b, self.work, self.select, self.blockSize,
+			) for f, a, b in self.ranges
+		]
+		#endregion --------------------------------------------------> Submit
+
+		#region ------------------------------------------------------> Yield
+		try:
+			for (self.source, *_), f in zip(self.ranges, future):
+				res, count = f.result()
+				self.ltotal    += count[0]
+				self.lempty    += count[1]
+				self.prottotal += count[2]
+				self.protfrag  += count[3]
+				if self.progress is not None:
+					self.progress(self)
+				else:
+					pass
+				yield res
+		finally:
+			for f in future:
+				f.cancel()
+		#endregion ---------------------------------------------------> Yield
+	#---
+	#endregion ------------------------------------------------> Class methods
+#---
+
+class StoreReader(FastaReader):
+	"""Iterate over the proteins in a protein store written by WriteStore.
+		The store is memory-mapped, the headers are read as columns and the
+		sequences are memoryview slices of the map, so nothing is parsed.
+
+		Parameters
+		----------
+		fFile : str or Path
+			Path to the protein store
+		select : callable or None
+			Called with each FastaRecord. accession and gene are already set.
+			Only the records for which it returns True are yielded. None 
+			yields all records
+		progress : callable or None
+			Called with the reader every STEP proteins
+		blockSize : int
+			Not used. Kept for the same signature as the other readers
+
+		Notes
+		-----
+		ltotal and lempty are the ones of the fasta file and are set before 
+		the first protein. The map is closed when the last sequence slice is
+		released.
+	"""
+	#region -----------------------------------------------------> Class setup
+	STEP = 1 << 14
+	#endregion --------------------------------------------------> Class setup
+
+	#region ---------------------------------------------------> Class methods
+	def __iter__(self):
+		"""Yield the FastaRecord of the selected proteins"""
+		#region --------------------------------------------------------> Open
+		with open(self.fFile, 'rb') as file:
+			mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+		meta = StoreMeta(mm)
+		view = memoryview(mm)
+		part = {k: view[a:a+n] for k, (a, n) in meta['Section'].items()}
+		#endregion -----------------------------------------------------> Open
+
+		#region ---------------------------------------------------> Variables
+		self.ltotal, self.lempty = meta['Count'][0:2]
+		nProt = meta['Count'][2]
+		if nProt == 0:
+			return
+		else:
+			pass
+		header    = str(part['Header'], 'utf-8').split('\n')
+		accession = str(part['Accession'], 'utf-8').split('\n')
+		gene      = str(part['Gene'], 'utf-8').split('\n')
+		fragment  = part['Fragment']
+		if meta['ByteOrder'] == sys.byteorder:
+			offset = part['Offset'].cast('q')
+		else:
+			offset = array('q', part['Offset'])
+			offset.byteswap()
+		seq    = part['Sequence']
+		select = self.select
+		#endregion ------------------------------------------------> Variables
+
+		#region -----------------------------------------------------> Records
+		for i in range(nProt):
+			record           = FastaRecord(header[i])
+			record.accession = accession[i]
+			record.gene      = None if gene[i] == '\0' else gene[i]
+			self.prottotal  += 1
+			self.protfrag   += fragment[i]
+			if select is None or select(record):
+				record.raw = seq[offset[i]:offset[i+1]]
+				yield record
+			else:
+				pass
+			if self.progress is not None and not (i+1) % self.STEP:
+				self.progress(self)
+			else:
+				pass
+		#endregion --------------------------------------------------> Records
+	#---
+	#endregion ------------------------------------------------> Class methods
+#---
+#endregion ----------------------------------------------------------> Classes
+
+#region -------------------------------------------------------------> Methods
+def GetReader(fFile, useMmap=True, **kwargs):
+	"""Reader for a fasta file
+
+		Parameters
+		----------
+		fFile : str or Path
+			Path to the fasta file
+		useMmap : bool
+			Use FastaMmapReader if the file can be memory-mapped, i.e. it is
+			a regular file and it is not compressed
+		**kwargs
+			Passed to the reader
+
+		Returns
+		-------
+		FastaReader, FastaMmapReader or StoreReader
+	"""
+	if IsStore(fFile):
+		return StoreReader(fFile, **kwargs)
+	elif useMmap and Mappable(fFile):
+		return FastaMmapReader(fFile, **kwargs)
+	else:
+		return FastaReader(fFile, **kwargs)
+#---
+
+def Column(view):
+	"""Lines of a UTF-8 column in a protein store or a FastaIndex file
+
+		Parameters
+		----------
+		view : bytes-like
+			Section of the file
+
+		Returns
+		-------
+		list of str
+	"""
+	if len(view):
+		return str(view, 'utf-8').split('\n')
+	else:
+		return []
+#---
+
+def JoinLines(raw):
+	"""Join sequence lines
+
+		Parameters
+		----------
+		raw : str or bytes-like
+			Sequence lines. Bytes are decoded as latin-1
+
+		Returns
+		-------
+		str
+	"""
+	if isinstance(raw, str):
+		seq = raw.replace('\n', '')
+	else:
+		seq = bytes(raw).replace(b'\n', b'').decode('latin-1')
+	#--> Carriage returns or spaces left at the line ends
+	if '\r' in seq or ' ' in seq or '\t' in seq:
+		return "".join(seq.split())
+	else:
+		return seq
+#---
+
+def ParseHeader(header, genes=None, fold=False):
+	"""Fields in a fasta header. This is how FastaRecord gets accession and
+		gene, so the Consensus and Gene tabs read the headers here
+
+		Parameters
+		----------
+		header : str
+			Header line, including the '>'
+		genes : frozenset of str or None
+			Keep only the headers with a gene in genes, as returned by 
+			GeneKey. Only GN= is searched in the other headers
+		fold : bool
+			Ignore the case of the gene names
+
+		Returns
+		-------
+		UniProtHeader or None
+			None if the gene is not in genes
+	"""
+	uniprot = UniProtHeader(header)
+	if genes is None or GeneKey(uniprot.gene, fold) in genes:
+		return uniprot
+	else:
+		return None
+#---
+
+def HeaderAccession(header):
+	"""Accession in a fasta header. The text between the first two | or 
+		the first word if there is no |
+
+		Parameters
+		----------
+		header : str
+			Header line, including the '>'
+
+		Returns
+		-------
+		str
+	"""
+	tList = header.split('|', 2)
+	if len(tList) > 1:
+		return tList[1]
+	else:
+		tList = header[1:].split(maxsplit=1)
+		return tList[0] if tList else ''
+#---
+
+def HeaderGene(header):
+	"""Gene in a fasta header. The value of the first word with GN=. 
+		str.find is faster than a regex here, and this is called for every
+		protein in the Gene tab
+
+		Parameters
+		----------
+		header : str
+			Header line, including the '>'
+
+		Returns
+		-------
+		str or None
+			None if there is no GN=
+	"""
+	a = header.find('GN=')
+	if a == -1:
+		return None
+	else:
+		pass
+	if header[a-1] != ' ':
+		a = header.rfind(' ', 0, a) + 1
+	else:
+		pass
+	b = header.find(' ', a)
+	return (header[a:] if b == -1 else header[a:b]).split('=')[1]
+#---
+
+def GeneKey(gene, fold=False):
+	"""Key of a gene name in a set of gene names
+
+		Parameters
+		----------
+		gene : str or None
+			Gene name, e.g. FastaRecord.gene
+		fold : bool
+			Ignore the case of the gene name
+
+		Returns
+		-------
+		str or None
+	"""
+	if fold and gene is not None:
+		return gene.casefold()
+	else:
+		return gene
+#---
+
+def FastaFiles(tStr):
+	"""Fasta files in the value of a Fasta File field. Several paths or glob
+		patterns can be given separated by ;, e.g. 
+		uniprot.fasta; isoforms/*.fasta
+
+		Parameters
+		----------
+		tStr : str
+			Value of the field
+
+		Returns
+		-------
+		list of Path
+			Existing files, without repetitions. The files matching a pattern
+			are sorted by name. Folders matching a pattern are skipped
+
+		Raises
+		------
+		ValueError
+			If a path does not exist, a pattern matches no file or there are
+			no files
+	"""
+	#--> An existing file is never read as a pattern, e.g. data [2019].fasta
+	if os.path.isfile(tStr.strip()):
+		return [Path(tStr.strip())]
+	else:
+		pass
+	files = []
+	for x in tStr.split(';'):
+		if not (x := x.strip()):
+			continue
+		elif os.path.isfile(x):
+			match = [x]
+		elif any(c in x for c in '*?['):
+			match = sorted(y for y in glob.glob(x) if os.path.isfile(y))
+			if not match:
+				raise ValueError(f'No file matches {x}.')
+			else:
+				pass
+		else:
+			raise ValueError(f'{x} is not a file.')
+		for m in map(Path, match):
+			if m not in files:
+				files.append(m)
+			else:
+				pass
+	if not files:
+		raise ValueError('There are no files.')
+	else:
+		pass
+	return files
+#---
+
+def Mappable(fFile):
+	"""Check the file can be memory-mapped and indexed with FastaIndex
+
+		Parameters
+		----------
+		fFile : str or Path
+			Path to the fasta file
+
+		Returns
+		-------
+		bool
+			True for regular, uncompressed fasta files
+	"""
+	return (
+		os.path.isfile(fFile) 
+		and pstCompress.Codec(fFile) is None
+		and not IsStore(fFile)
+	)
+#---
+
+def IsStore(fFile):
+	"""Check the file is a protein store written by WriteStore
+
+		Parameters
+		----------
+		fFile : str or Path
+			Path to the file
+
+		Returns
+		-------
+		bool
+	"""
+	with open(fFile, 'rb') as file:
+		return file.read(len(STORE)) == STORE
+#---
+
+def StoreMeta(mm):
+	"""Read the metadata of a protein store
+
+		Parameters
+		----------
+		mm : mmap.mmap or bytes
+			Content of the store
+
+		Returns
+		-------
+		dict
+			Keys are Version, ByteOrder, Count and Section
+
+		Raises
+		------
+		ValueError
+			If the store was written by a newer version of WriteStore
+	"""
+	n    = int.from_bytes(mm[-8:], 'little')
+	meta = json.loads(mm[-8-n:-8])
+	if meta['Version'] > STORE_VERSION:
+		raise ValueError('The protein store was created by a newer version.')
+	else:
+		pass
+	return meta
+#---
+
+def WriteStore(fFile, sFile, progress=None, blockSize=1<<20):
+	"""Convert a fasta file into a protein store. Searching the store with 
+		StoreReader gives the same results as searching the fasta file.
+
+		Parameters
+		----------
+		fFile : str or Path
+			Path to the fasta file. It can be compressed
+		sFile : str or Path
+			Path to the protein store
+		progress : callable or None
+			Called with the reader after each block of the fasta file
+		blockSize : int
+			Characters or bytes read at once from the fasta file
+
+		Returns
+		-------
+		FastaReader or FastaMmapReader
+			Reader used for the fasta file, with the final counters
+
+		Notes
+		-----
+		The store starts with STORE and has the sections Sequence (all 
+		sequences as latin-1 bytes), Offset (int64 start of each sequence 
+		plus the end of the last one), Header, Accession and Gene (UTF-8 
+		columns, one line per protein, '\\0' for proteins without gene) and
+		Fragment (one byte per protein). Each section starts at a multiple of
+		8. The JSON metadata with the position of the sections follows and 
+		the file ends with the length of the metadata as uint64.
+	"""
+	#region ---------------------------------------------------> Variables
+	reader    = GetReader(fFile, progress=progress, blockSize=blockSize)
+	offset    = array('q', [0])
+	header    = []
+	accession = []
+	gene      = []
+	fragment  = bytearray()
+	section   = {}
+	#endregion ------------------------------------------------> Variables
+
+	#region -------------------------------------------------------> Write
+	with open(sFile, 'wb') as file:
+		file.write(STORE)
+		#--> Sequences while reading the fasta file
+		start = file.tell()
+		for r in reader:
+			n = file.write(r.sequence.encode('latin-1', 'replace'))
+			offset.append(offset[-1] + n)
+			header.append(r.header)
+			accession.append(r.accession)
+			gene.append('\0' if r.gene is None else r.gene)
+			fragment.append(r.fragment)
+		section['Sequence'] = [start, offset[-1]]
+		#--> Columns
+		for k, v in (
+			('Offset'   , offset.tobytes()),
+			('Header'   , '\n'.join(header).encode('utf-8')),
+			('Accession', '\n'.join(accession).encode('utf-8')),
+			('Gene'     , '\n'.join(gene).encode('utf-8')),
+			('Fragment' , fragment),
+			):
+			file.write(b'\0' * (-file.tell() % 8))
+			section[k] = [file.tell(), len(v)]
+			file.write(v)
+		#--> Metadata
+		meta = json.dumps({
+			'Version'  : STORE_VERSION,
+			'ByteOrder': sys.byteorder,
+			'Count'    : [
+				reader.ltotal, reader.lempty, reader.prottotal, 
+				reader.protfrag,
+			],
+			'Section'  : section,
+		}).encode('utf-8')
+		file.write(meta)
+		file.write(len(meta).to_bytes(8, 'little'))
+	#endregion ----------------------------------------------------> Write
+
+	return reader
+#---
+#endregion ----------------------------------------------------------> Methods
+
+#region -------------------------------------------------------> Process pool
+def Ranges(fFile, rangeSize):
+	"""Split a plain fasta file in byte ranges starting at the '>' of a 
+		protein
+
+		Parameters
+		----------
+		fFile : str or Path
+			Path to the fasta file
+		rangeSize : int
+			Minimum number of bytes in each range
+
+		Returns
+		-------
+		list of tuple
+			Start and stop of each range, e.g. [(0, 16777301), ...]
+	"""
+	ranges = []
+	with open(fFile, 'rb') as file:
+		size = os.fstat(file.fileno()).st_size
+		if size == 0:
+			return ranges
+		else:
+			pass
+		with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+			a = 0
+			while a < size:
+				b = mm.find(b'\n>', min(a + rangeSize, size) - 1)
+				b = size if b == -1 else b + 1
+				ranges.append((a, b))
+				a = b
+	return ranges
+#---
+
+def ParseRange(fFile, start, stop, work=list, select=None, blockSize=1<<20):
+	"""Read a byte range of a fasta file. Runs in a worker of 
+		FastaRangeReader
+
+		Parameters
+		----------
+		fFile : str or Path
+			Path to the fasta file
+		start, stop : int
+			Range of the file, as returned by Ranges
+		work : callable
+			Called with the FastaMmapReader of the range
+		select : callable or None
+			Same as in FastaReader
+		blockSize : int
+			Minimum number of bytes in each block
+
+		Returns
+		-------
+		tuple
+			(work(reader), [ltotal, lempty, prottotal, protfrag])
+	"""
+	reader = FastaMmapReader(
+		fFile, select=select, blockSize=blockSize, start=start, stop=stop)
+	res = work(reader)
+	return (
+		res, 
+		[reader.ltotal, reader.lempty, reader.prottotal, reader.protfrag],
+	)
+#---
+
+def IndexRange(records, work=list, select=None):
+	"""work for FastaRangeReader. Index all proteins of the range while work
+		reads the selected ones, so FastaIndex is built in the same pass. Use
+		functools.partial to set work and select and give no select to 
+		FastaRangeReader
+
+		Parameters
+		----------
+		records : FastaMmapReader
+			Reader of the range
+		work : callable
+			Called with the selected records. It must read all of them
+		select : callable or None
+			Same as in FastaReader
+
+		Returns
+		-------
+		tuple
+			(IndexPart, work(selected records))
+	"""
+	part = IndexPart()
+	res  = work(r for r in part.Add(records) if select is None or select(r))
+	return (part, res)
+#---
+
+def SelectGene(genes, record, fold=False):
+	"""select for FastaRangeReader and the other readers. Use 
+		functools.partial to set genes and fold. The header of the record is
+		parsed with ParseHeader and kept in record.uniprot
+
+		Parameters
+		----------
+		genes : frozenset of str
+			Gene names, as returned by GeneKey
+		record : FastaRecord
+			Protein
+		fold : bool
+			Ignore the case of the gene names
+
+		Returns
+		-------
+		bool
+	"""
+	record.uniprot = ParseHeader(record.header, genes, fold)
+	return record.uniprot is not None
+#---
+
+def SelectComplete(record):
+	"""select for FastaRangeReader. Skip fragments
+
+		Parameters
+		----------
+		record : FastaRecord
+			Protein
+
+		Returns
+		-------
+		bool
+	"""
+	return not record.fragment
+#---
+
+def SliceRows(records, slices, stop=None):
+	"""work for FastaRangeReader. Gene, accession and parts of the sequence
+		of the proteins, as needed by the Gene tab
+
+		Parameters
+		----------
+		records : iterable of FastaRecord
+			Proteins
+		slices : list of slice
+			Parts of the sequence, e.g. [slice(0, 10), slice(-5, None)]
+		stop : int or None
+			Residues needed from the start of the sequence for all slices.
+			None uses the whole sequence
+
+		Returns
+		-------
+		list of list
+			[[gene, accession, seq[slices[0]], ...], ...]
+	"""
+	rows = []
+	for r in records:
+		seq = r.sequence if stop is None else r.Prefix(stop)
+		rows.append([r.gene, r.accession] + [seq[x] for x in slices])
+	return rows
+#---
+#endregion ----------------------------------------------------> Process pool
@@ -0,0 +1,418 @@
+# ------------------------------------------------------------------------------
+# Author: Kenny Bravo Rodriguez 2019 (kenny.bravorodriguez@mpi-dortmund.mpg.de)
+#
+# Copyright (c) 2019 Max Planck Institute of Molecular Physiology
+#
+# This complete copyright notice must be included in any revised version of the
+# source code. Additional authorship citations may be added, but existing
+# author citations must be preserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ------------------------------------------------------------------------------
+
+"""Gene files of the Gene tab. Nothing in this module depends on wxPython.
+
+	GeneSearch holds the genes and the results of one Gene File, so the Gene
+	Files of several projects can share one scan of the fasta file. The rows
+	of the results are sorted in runs of a limited size kept in temporary
+	files and merged when the output is written.
+
+	The Residues to Extract field is a list of windows compiled once by
+	ReadWindows into slices of the protein sequence:
+	- 10 or N10: residues 1 to 10
+	- C10: last 10 residues
+	- 5-20: residues 5 to 20
+	- 50:3: residues 47 to 53, i.e. 3 residues at each side of residue 50
+"""
+
+#region -------------------------------------------------------------> Imports
+import heapq
+import os
+import pickle
+import re
+import tempfile
+from operator import itemgetter
+from pathlib import Path
+
+import data.compress as pstCompress
+import data.fasta as pstFasta
+#endregion ----------------------------------------------------------> Imports
+
+#region -----------------------------------------------------------> VARIABLES
+WINDOW = re.compile( # A window in the Residues to Extract field
+	r'N?(?P<n>\d+)|C(?P<c>\d+)|(?P<a>\d+)-(?P<b>\d+)|(?P<k>\d+):(?P<w>\d+)',
+	re.IGNORECASE,
+)
+#endregion --------------------------------------------------------> VARIABLES
+
+#region -------------------------------------------------------------> Classes
+class GeneSearch():
+	"""Genes and results of one Gene File
+
+		Parameters
+		----------
+		gFile : Path
+			Gene File
+		oFile : str
+			Output File for the results of gFile
+		fold : bool
+			Ignore the case of the gene names
+		bufferRows : int
+			Maximum number of rows kept in memory. The sorted rows are moved
+			to a temporary file when there are more. 0 keeps all rows in
+			memory
+
+		Attributes
+		----------
+		geneLine : dict
+			{frozenset of keys: line}. Keys, as returned by
+			data.fasta.GeneKey, of the gene and its aliases in each line of
+			the file. Repeated lines are kept once
+		geneSet : frozenset
+			Keys of all genes in the file
+		dataO : list of list
+			Rows of the output not yet in a run, [gene, accession, seq, ...]
+		runs : list of file objects
+			Temporary files with the sorted runs of rows, in the order they
+			were written
+		found : set
+			Keys of the genes found
+		geneMiss : list of str
+			Lines of the file with no gene found. Set in Finish
+
+		Methods
+		-------
+		Add(row, key)
+			Add a protein of the genes
+		Spill()
+			Move the rows in memory to a new sorted run
+		Finish()
+			Sort the proteins and get the genes not found
+		Rows(size)
+			Sorted rows of the output
+	"""
+	#region --------------------------------------------------> Instance setup
+	def __init__(self, gFile, oFile, fold=False, bufferRows=0):
+		""""""
+		#region ------------------------------------------------------> Input
+		self.gFile = gFile
+		self.oFile = oFile
+		self.fold  = fold
+		self.bufferRows = bufferRows
+		#endregion ---------------------------------------------------> Input
+
+		#region ----------------------------------------------------> Prepare
+		self.geneLine  = ReadGenes(gFile, fold)
+		self.geneSet   = frozenset().union(*self.geneLine)
+		self.dataO     = []
+		self.runs      = []
+		self.found     = set()
+		self.geneMiss  = []
+		#endregion -------------------------------------------------> Prepare
+	#---
+	#endregion -----------------------------------------------> Instance setup
+
+	#region ---------------------------------------------------> Class methods
+	def Add(self, row, key):
+		"""Add a protein of the genes
+
+			Parameters
+			----------
+			row : list
+				Row of the output, [gene, accession, seq, ...]
+			key : str
+				Key of the gene of the protein
+		"""
+		self.found.add(key)
+		self.dataO.append(row)
+		if self.bufferRows and len(self.dataO) >= self.bufferRows:
+			self.Spill()
+		else:
+			pass
+	#---
+
+	def Spill(self, size=1000):
+		"""Sort the rows in memory by gene and accession and pickle them to
+			a temporary file in groups of size rows
+
+			Parameters
+			----------
+			size : int
+				Number of rows pickled at once
+		"""
+		self.dataO.sort(key=itemgetter(0, 1))
+		file = tempfile.TemporaryFile()
+		for i in range(0, len(self.dataO), size):
+			pickle.dump(
+				self.dataO[i:i+size], file, protocol=pickle.HIGHEST_PROTOCOL)
+		file.seek(0)
+		self.runs.append(file)
+		self.dataO = []
+	#---
+
+	def Finish(self):
+		"""Sort the proteins by gene and accession and get the lines of the
+			Gene File with no gene found
+		"""
+		self.dataO.sort(key=itemgetter(0, 1))
+		self.geneMiss = [
+			g for k, g in self.geneLine.items() if self.found.isdisjoint(k)
+		]
+	#---
+
+	def Rows(self, size=1000):
+		"""Rows of the output sorted by gene and accession. The runs and the
+			rows in memory are merged with heapq.merge, which keeps rows with
+			the same gene and accession in the order they were added, as
+			list.sort does. The temporary files are closed at the end
+
+			Parameters
+			----------
+			size : int
+				Number of rows yielded at once
+
+			Yields
+			------
+			list of list
+				Next size rows
+		"""
+		#region -------------------------------------------------> In memory
+		if not self.runs:
+			for i in range(0, len(self.dataO), size):
+				yield self.dataO[i:i+size]
+			return
+		else:
+			pass
+		#endregion ----------------------------------------------> In memory
+
+		#region -----------------------------------------------------> Merge
+		rows = []
+		try:
+			for row in heapq.merge(
+				*[ReadRun(x) for x in self.runs], 
+				self.dataO,
+				key = itemgetter(0, 1),
+				):
+				rows.append(row)
+				if len(rows) == size:
+					yield rows
+					rows = []
+				else:
+					pass
+			if rows:
+				yield rows
+			else:
+				pass
+		finally:
+			for x in self.runs:
+				x.close()
+			self.runs = []
+		#endregion --------------------------------------------------> Merge
+	#---
+	#endregion ------------------------------------------------> Class methods
+#---
+#endregion ----------------------------------------------------------> Classes
+
+#region -------------------------------------------------------------> Methods
+def ReadGenes(gFile, fold=False):
+	"""Read a Gene File. Each line has a gene or a ;-separated list of
+		aliases
+
+		Parameters
+		----------
+		gFile : str or Path
+			Gene File. It can be compressed
+		fold : bool
+			Ignore the case of the gene names
+
+		Returns
+		-------
+		dict
+			{frozenset of keys: line}. The keys are the line and its aliases,
+			as returned by data.fasta.GeneKey
+	"""
+	geneLine = {}
+	with pstCompress.Open(gFile, 'r') as file:
+		for line in file:
+			g = "".join(line.split())
+			g = g.replace('"', "")
+			if g == '':
+				continue
+			else:
+				pass
+			keys = [g]
+			if ";" in g:
+				keys.extend(x for x in g.split(";") if x)
+			else:
+				pass
+			keys = frozenset(pstFasta.GeneKey(x, fold) for x in keys)
+			geneLine.setdefault(keys, g)
+	return geneLine
+#---
+
+def ReadRun(file):
+	"""Rows of a run written by GeneSearch.Spill
+
+		Parameters
+		----------
+		file : file object
+			Temporary file of the run
+
+		Yields
+		------
+		list
+			Row of the output
+	"""
+	while True:
+		try:
+			rows = pickle.load(file)
+		except EOFError:
+			return
+		yield from rows
+#---
+
+def ReadWindows(tStr):
+	"""Compile the value of the Residues to Extract field
+
+		Parameters
+		----------
+		tStr : str
+			Space-separated windows, e.g. '5 10 C10 5-20 50:3'
+
+		Returns
+		-------
+		list of tuple
+			(column name, slice) for each window, in the given order. Plain 
+			lengths keep the 1-N column name, e.g. ('1-10', slice(0, 10)).
+			Repeated windows give repeated columns
+
+		Raises
+		------
+		ValueError
+			If a window is not valid, has a residue number equal to 0 or ends
+			before it starts
+	"""
+	windows = []
+	for x in tStr.split():
+		if (m := WINDOW.fullmatch(x)) is None:
+			raise ValueError(f'Invalid window: {x}')
+		elif any(
+			int(v) == 0 for g, v in m.groupdict().items() 
+			if v is not None and g != 'w'
+			):
+			raise ValueError(f'Residue numbers start at 1: {x}')
+		elif m['n'] is not None:
+			n = int(m['n'])
+			name, sl = f'1-{n}', slice(0, n)
+		elif m['c'] is not None:
+			n = int(m['c'])
+			name, sl = f'C{n}', slice(-n, None)
+		elif m['a'] is not None:
+			a, b = int(m['a']), int(m['b'])
+			if b < a:
+				raise ValueError(f'Invalid window: {x}')
+			else:
+				pass
+			name, sl = f'{a}-{b}', slice(a-1, b)
+		else:
+			k, w = int(m['k']), int(m['w'])
+			name, sl = f'{k}:{w}', slice(max(k-w-1, 0), k+w)
+		windows.append((name, sl))
+	if windows:
+		return windows
+	else:
+		raise ValueError('There are no windows.')
+#---
+
+def WindowStop(windows):
+	"""Number of residues needed from the start of the sequence to get all
+		windows
+
+		Parameters
+		----------
+		windows : list of tuple
+			As returned by ReadWindows
+
+		Returns
+		-------
+		int or None
+			None if a window needs the end of the sequence, e.g. C10
+	"""
+	if any(sl.stop is None for _, sl in windows):
+		return None
+	else:
+		return max(sl.stop for _, sl in windows)
+#---
+
+def GeneFiles(tStr):
+	"""Gene Files in the value of the Gene File field. A folder gives all
+		files in it. Several paths or glob patterns can also be given
+		separated by ;, as in data.fasta.FastaFiles
+
+		Parameters
+		----------
+		tStr : str
+			Value of the field
+
+		Returns
+		-------
+		list of Path
+
+		Raises
+		------
+		ValueError
+			If a path does not exist, a pattern matches no file or there are
+			no files
+	"""
+	if os.path.isdir(tStr.strip()):
+		files = sorted(
+			x for x in Path(tStr.strip()).iterdir()
+			if x.is_file() and not x.name.startswith('.')
+		)
+		if files:
+			return files
+		else:
+			raise ValueError(f'There are no files in {tStr.strip()}.')
+	else:
+		return pstFasta.FastaFiles(tStr)
+#---
+
+def OutFiles(oFile, gFiles):
+	"""Output File of each Gene File. The name of the Gene File is added to
+		oFile if there are several Gene Files, e.g. out-projectA.txt. A
+		number is also added if two Gene Files have the same name
+
+		Parameters
+		----------
+		oFile : str
+			Value of the Output File field
+		gFiles : list of Path
+			Gene Files
+
+		Returns
+		-------
+		list of str
+	"""
+	if len(gFiles) == 1:
+		return [oFile]
+	else:
+		pass
+	root, ext = os.path.splitext(oFile)
+	names = [x.name.split('.')[0] for x in gFiles]
+	if len(set(names)) == len(names):
+		return [f"{root}-{x}{ext}" for x in names]
+	else:
+		return [f"{root}-{n}-{x}{ext}" for n, x in enumerate(names, start=1)]
+#---
+#endregion ----------------------------------------------------------> Methods
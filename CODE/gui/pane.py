@@ -35,6 +35,7 @@ import dat4s_core.widget.wx_window as dtsWindow
 import dat4s_core.validator.validator as dtsValidator
 
 import config.config as config
+import data.compress as pstCompress
 import gui.widget as pstWidget
 #endregion ----------------------------------------------------------> Imports
 
@@ -98,7 +99,7 @@ class PeptidePane(wx.Panel, pstWidget.UserInput):
 			self.sbFile,
 			btnLabel  = config.label[name]['DataFile'],
 			tcHint    = config.hint[name]['DataFile'],
-			ext       = config.extLong['Data'],
+			ext       = config.extLong['DataIn'],
 			listCtrl  = lc,
 			validator = dtsValidator.IsNotEmpty(
 				parent,
@@ -236,6 +237,7 @@ class PeptidePane(wx.Panel, pstWidget.UserInput):
 		#endregion ---------------------------------------------------> Sizers
 
 		self.btnGroup.btnClear.Bind(wx.EVT_BUTTON, self.OnClear)
+		self.dataFile.tc.Bind(wx.EVT_TEXT, self.OnDataFile)
 
 		#region ----------------------------> Test & Default production values
 		if config.development:
@@ -267,6 +269,49 @@ class PeptidePane(wx.Panel, pstWidget.UserInput):
 		#endregion ------------> Skip event to clear wx.TextCtrl & wx.ComboBox
 	#---
 
+	def OnDataFile(self, event):
+		"""Show the columns of a compressed Data File. dtsWidget reads the 
+			file as plain text, so the wx.ListCtrl is filled again after it
+		"""
+		wx.CallAfter(self.ShowColumns)
+		event.Skip()
+	#---
+
+	def ShowColumns(self):
+		"""Fill the wx.ListCtrl with the columns of a compressed Data File"""
+		colNames = self.ColumnNames()
+		if colNames is None or self.lc is None:
+			return False
+		else:
+			pass
+		self.lc.DeleteAllItems()
+		for k, c in enumerate(colNames):
+			self.lc.Append([str(k), c])
+		return True
+	#---
+
+	def ColumnNames(self):
+		"""Names of the columns in a compressed Data File, read from its first
+			line with data.compress.Open
+
+			Returns
+			-------
+			list of str or None
+				None if the file is not compressed or cannot be read
+		"""
+		iFile = self.dataFile.tc.GetValue()
+		try:
+			if pstCompress.Codec(iFile) is None:
+				return None
+			else:
+				pass
+			with pstCompress.Open(iFile, 'r') as file:
+				header = file.readline()
+		except (OSError, ValueError, EOFError):
+			return None
+		return dtsStr.Str2List(header, sep='\t')
+	#---
+
 	def CheckInput(self):
 		"""Chek user input. Overrides BaseTab.CheckInput"""
 		#region ---------------------------------------------------------> Msg
@@ -280,6 +325,12 @@ class PeptidePane(wx.Panel, pstWidget.UserInput):
 			pass
 		else:
 			return False
+		if pstCompress.Supported(self.dataFile.tc.GetValue()):
+			pass
+		else:
+			msg = config.msg['Error'][self.name]['Zstd']
+			dtsWindow.MessageDialog('errorF', msg, parent=self.parent)
+			return False
 
 		msg = f"{msgM}: {config.label[self.name]['OutFile']}"
 		wx.CallAfter(dtsWidget.StatusBarUpdate, self.statusbar, msg)
@@ -295,6 +346,12 @@ class PeptidePane(wx.Panel, pstWidget.UserInput):
 		else:
 			return False
 		
+		#--> Columns of a compressed Data File. dtsWidget reads it as plain text
+		if (colNames := self.ColumnNames()) is not None:
+			self.dataFile.Ncol = len(colNames) - 1
+		else:
+			pass
+
 		msg = f"{msgM}: {config.label[self.name]['StartResidue']}"
 		wx.CallAfter(dtsWidget.StatusBarUpdate, self.statusbar, msg)
 		if self.startRes.tc.GetValidator().Validate(
@@ -368,7 +425,7 @@ class PeptidePane(wx.Panel, pstWidget.UserInput):
 		#endregion ------------------------------------------------------> Msg
 
 		#region -----------------------------------------------------> Process
-		with open(self.iFile, 'r') as iFile:
+		with pstCompress.Open(self.iFile, 'r') as iFile:
 			for line in iFile:
 				self.ltotal += 1
 				l = dtsStr.Str2List(line, sep='\t')
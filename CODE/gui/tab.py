@@ -25,20 +25,25 @@
 """
 
 #region -------------------------------------------------------------- Imports
-import ast
-import itertools
-from operator import itemgetter
+import concurrent.futures
+import contextlib
+import functools
+import os
+from collections import deque
 
 import wx
 import wx.lib.agw.aui as aui
 
 import dat4s_core.data.filefolder as dtsFF
-import dat4s_core.data.string as dtsStr
 import dat4s_core.validator.validator as dtsValidator
 import dat4s_core.widget.wx_widget as dtsWidget
 import dat4s_core.widget.wx_window as dtsWindow
 
 import config.config as config
+import data.compress as pstCompress
+import data.consensus as pstConsensus
+import data.fasta as pstFasta
+import data.gene as pstGene
 import gui.pane as pstPane
 import gui.widget as pstWidget
 import gui.window as pstWindow
@@ -111,11 +116,52 @@ class ConsensusTab(wx.Panel, pstWidget.UserInput):
 				config.msg['Error'][name]['PosAA'],
 			),
 		)
+		#--> wx.StaticText & wx.TextCtrl
+		self.maxMis = dtsWidget.StaticTextCtrl(
+			self.sbValue,
+			stLabel   = config.label[name]['MaxMis'],
+			tcHint    = config.hint[name]['MaxMis'],
+			validator = dtsValidator.NumberList(
+				parent,
+				config.msg['Error'][name]['MaxMis'],
+				refMin = 0,
+			),
+		)
+		self.maxMis.tc.SetValue("0")
+		self.topK = dtsWidget.StaticTextCtrl(
+			self.sbValue,
+			stLabel   = config.label[name]['TopK'],
+			tcHint    = config.hint[name]['TopK'],
+			validator = dtsValidator.NumberList(
+				parent,
+				config.msg['Error'][name]['TopK'],
+				refMin = 1,
+				opt    = True,
+			),
+		)
+		self.minCount = dtsWidget.StaticTextCtrl(
+			self.sbValue,
+			stLabel = config.label[name]['MinCount'],
+			tcHint  = config.hint[name]['MinCount'],
+		)
 		#--> CheckBox
 		self.cbCompProt = wx.CheckBox(
 			self.sbValue,
 			label = config.label[name]['CompProt'],
 		)
+		self.cbZeroCount = wx.CheckBox(
+			self.sbValue,
+			label = config.label[name]['ZeroCount'],
+		)
+		self.cbZeroCount.SetValue(True)
+		self.cbOccurrence = wx.CheckBox(
+			self.sbValue,
+			label = config.label[name]['Occurrence'],
+		)
+		self.cbAACount = wx.CheckBox(
+			self.sbValue,
+			label = config.label[name]['AACount'],
+		)
 		#endregion --------------------------------------------------> Widgets
 
 		#region ------------------------------------------------------> Sizers
@@ -161,9 +207,66 @@ class ConsensusTab(wx.Panel, pstWidget.UserInput):
 			flag   = wx.EXPAND|wx.ALL,
 		)
 		self.sizersbValueWid.Add(
-			self.cbCompProt,
+			self.maxMis.st,
 			pos    = (1,0),
 			border = 5,
+			flag   = wx.ALIGN_CENTER_VERTICAL|wx.ALIGN_RIGHT|wx.ALL,
+		)
+		self.sizersbValueWid.Add(
+			self.maxMis.tc,
+			pos    = (1,1),
+			border = 5,
+			flag   = wx.EXPAND|wx.ALL,
+		)
+		self.sizersbValueWid.Add(
+			self.topK.st,
+			pos    = (2,0),
+			border = 5,
+			flag   = wx.ALIGN_CENTER_VERTICAL|wx.ALIGN_RIGHT|wx.ALL,
+		)
+		self.sizersbValueWid.Add(
+			self.topK.tc,
+			pos    = (2,1),
+			border = 5,
+			flag   = wx.EXPAND|wx.ALL,
+		)
+		self.sizersbValueWid.Add(
+			self.minCount.st,
+			pos    = (3,0),
+			border = 5,
+			flag   = wx.ALIGN_CENTER_VERTICAL|wx.ALIGN_RIGHT|wx.ALL,
+		)
+		self.sizersbValueWid.Add(
+			self.minCount.tc,
+			pos    = (3,1),
+			border = 5,
+			flag   = wx.EXPAND|wx.ALL,
+		)
+		self.sizersbValueWid.Add(
+			self.cbCompProt,
+			pos    = (4,0),
+			border = 5,
+			span   = (0,2),
+			flag   = wx.EXPAND|wx.ALL,
+		)
+		self.sizersbValueWid.Add(
+			self.cbZeroCount,
+			pos    = (5,0),
+			border = 5,
+			span   = (0,2),
+			flag   = wx.EXPAND|wx.ALL,
+		)
+		self.sizersbValueWid.Add(
+			self.cbOccurrence,
+			pos    = (6,0),
+			border = 5,
+			span   = (0,2),
+			flag   = wx.EXPAND|wx.ALL,
+		)
+		self.sizersbValueWid.Add(
+			self.cbAACount,
+			pos    = (7,0),
+			border = 5,
 			span   = (0,2),
 			flag   = wx.EXPAND|wx.ALL,
 		)
@@ -239,6 +342,19 @@ class ConsensusTab(wx.Panel, pstWidget.UserInput):
 			pass
 		else:
 			return False
+		try:
+			fFileL = pstFasta.FastaFiles(self.fastaFile.tc.GetValue())
+		except ValueError as e:
+			msg = f"{config.msg['Error'][self.name]['FastaFileList']}\n{e}"
+			dtsWindow.MessageDialog('errorF', msg, parent=self.parent)
+			return False
+		for x in fFileL:
+			if pstCompress.Supported(x):
+				pass
+			else:
+				msg = f"{config.msg['Error'][self.name]['Zstd']}\n{x}"
+				dtsWindow.MessageDialog('errorF', msg, parent=self.parent)
+				return False
 		
 		msg = f"{msgM}: {config.label[self.name]['OutFile']}"
 		wx.CallAfter(dtsWidget.StatusBarUpdate, self.statusbar, msg)
@@ -253,11 +369,86 @@ class ConsensusTab(wx.Panel, pstWidget.UserInput):
 			pass
 		else:
 			return False
+		try:
+			pstConsensus.ReadPosAA(
+				self.posAA.tc.GetValue(), 
+				config.dictKey[self.name]['PosKey'],
+				optAA = config.optAA,
+			)
+		except ValueError as e:
+			msg = f"{config.msg['Error'][self.name]['PosAA']}\n{e}"
+			dtsWindow.MessageDialog('errorF', msg, parent=self.parent)
+			return False
+
+		msg = f"{msgM}: {config.label[self.name]['MaxMis']}"
+		wx.CallAfter(dtsWidget.StatusBarUpdate, self.statusbar, msg)
+		if self.maxMis.tc.GetValidator().Validate(self):
+			pass
+		else:
+			return False
+
+		msg = f"{msgM}: {config.label[self.name]['TopK']}"
+		wx.CallAfter(dtsWidget.StatusBarUpdate, self.statusbar, msg)
+		if self.topK.tc.GetValidator().Validate(self):
+			pass
+		else:
+			return False
+
+		msg = f"{msgM}: {config.label[self.name]['MinCount']}"
+		wx.CallAfter(dtsWidget.StatusBarUpdate, self.statusbar, msg)
+		if self.MinCountValue() is not None:
+			pass
+		else:
+			msg = config.msg['Error'][self.name]['MinCount']
+			dtsWindow.MessageDialog('errorF', msg, parent=self.parent)
+			return False
+
+		msg = f"{msgM}: {config.label[self.name]['AACount']}"
+		wx.CallAfter(dtsWidget.StatusBarUpdate, self.statusbar, msg)
+		if not self.cbAACount.GetValue() or pstConsensus.np is not None:
+			pass
+		else:
+			msg = config.msg['Error'][self.name]['AACount']
+			dtsWindow.MessageDialog('errorF', msg, parent=self.parent)
+			return False
 		#endregion ----------------------------------------> Individual Fields
 		
 		return True
 	#---
 
+	def MinCountValue(self):
+		"""Get the value in Minimum count
+
+			Returns
+			-------
+			tuple or None
+				(count, percent) with percent None for an integer value. None
+				if the value is not valid.
+		"""
+		#region -------------------------------------------------------> Value
+		val = "".join(self.minCount.tc.GetValue().split())
+		#endregion ----------------------------------------------------> Value
+
+		#region -------------------------------------------------------> Parse
+		try:
+			if val == '':
+				res = (0, None)
+			elif val[-1] == '%':
+				res = (0, float(val[0:-1]))
+			else:
+				res = (int(val), None)
+		except ValueError:
+			return None
+		#endregion ----------------------------------------------------> Parse
+
+		#region -------------------------------------------------------> Check
+		if res[0] < 0 or (res[1] is not None and not 0 <= res[1] <= 100):
+			return None
+		else:
+			return res
+		#endregion ----------------------------------------------------> Check
+	#---
+
 	def PrepareRun(self):
 		"""Prepare the run """
 		#region ---------------------------------------------------------> Msg
@@ -268,15 +459,33 @@ class ConsensusTab(wx.Panel, pstWidget.UserInput):
 		#region -----------------------------------------------------> Prepare
 		#--> Input
 		self.iFile    = self.fastaFile.tc.GetValue()
+		self.iFileL   = pstFasta.FastaFiles(self.iFile)
 		self.oFile    = self.outFile.tc.GetValue()
-		self.posAAVal = ast.literal_eval(self.posAA.tc.GetValue())
+		self.posAAVal = pstConsensus.ReadPosAA(
+			self.posAA.tc.GetValue(), 
+			config.dictKey[self.name]['PosKey'],
+			optAA = config.optAA,
+		)
+		self.maxMisV  = int(self.maxMis.tc.GetValue())
+		self.topKV    = (
+			int(v) if (v := self.topK.tc.GetValue().strip()) else None)
+		self.minC, self.minP = self.MinCountValue()
 		self.full     = self.cbCompProt.GetValue()
+		self.zeroC    = self.cbZeroCount.GetValue()
+		self.occ      = self.cbOccurrence.GetValue()
+		self.aaC      = self.cbAACount.GetValue()
 		#--> Output
 		self.d = {
 			config.label[self.name]['FastaFile']: self.iFile,
 			config.label[self.name]['OutFile'] : self.oFile,
 			config.label[self.name]['PosAA']   : self.posAA.tc.GetValue(),
+			config.label[self.name]['MaxMis']  : self.maxMisV,
+			config.label[self.name]['TopK']    : self.topK.tc.GetValue(),
+			config.label[self.name]['MinCount']: self.minCount.tc.GetValue(),
 			config.label[self.name]['CompProt']: self.full,
+			config.label[self.name]['ZeroCount']: self.zeroC,
+			config.label[self.name]['Occurrence']: self.occ,
+			config.label[self.name]['AACount']: self.aaC,
 		}
 		#--> Needed variables
 		self.ltotal    = 0
@@ -284,23 +493,47 @@ class ConsensusTab(wx.Panel, pstWidget.UserInput):
 		self.prottotal = 0
 		self.protsselT = 0
 		self.protfrag  = 0
-		#-> Signal if conSeq must be search in protSeq
-		self.searchP   = False 
-		#-> Value of Pos key to avoid using the printed name and config....
-		self.Pos = self.posAAVal[config.dictKey[self.name]['PosKey']]
-		#-> List of residues in which to look for the conSeq or None 
-		self.resID = [k for k in self.posAAVal.keys()][0:-1] if self.Pos else None
-		#-> List of possible AA in each position [['A', 'C'], ['K', 'R'] ...]
-		self.allAA = [x.split() for x in self.posAAVal.values() if type(x) == str]
-		#-> Count the appearances of conSeqs in the fasta proteins
-		self.seqProt = {} # = {'SeqA' : {Count: 0, PerCent: 0, pID: ''},}
-		for v in itertools.product(*self.allAA):
-			self.seqProt["".join(v)] = {'Count':0, 'PerCent':0, 'pID':''}
-		#-> Count the appearances of conSeqs in the fasta protein if the 
-		#-> search is done in the entire protein sequence
-		self.protSeq = {} # {ProtID: [SeqA, SeqB], .....}
-		#-> To check there is something to write to the output
-		self.countTotal = 0
+		#-> One search for each Positions & AAs configuration. All of them
+		#-> are done with the same scan of the fasta file
+		self.search = [
+			pstConsensus.ConsensusSearch(
+				x,
+				config.dictKey[self.name]['PosKey'],
+				maxMis    = self.maxMisV,
+				topK      = self.topKV,
+				minC      = self.minC,
+				minP      = self.minP,
+				zeroC     = self.zeroC,
+				occ       = self.occ,
+				engine    = config.consensus['Engine'],
+				posEngine = config.consensus['PosEngine'],
+				aaCount   = self.aaC,
+			) for x in self.posAAVal
+		]
+		#-> Count of the AAs in the residue numbers. Fragments are counted
+		#-> even if only complete proteins are searched
+		self.count = [x for x in self.search if x.aaCount is not None]
+		#-> Process pool. Only for the search in the whole sequence. Searching
+		#-> a few residue numbers is faster than sending the sequences
+		self.parallel = [x for x in self.search if not x.Pos]
+		if self.parallel and config.consensus['Workers'] > 1:
+			self.workers = config.consensus['Workers']
+			self.serial  = [x for x in self.search if x.Pos]
+		else:
+			self.workers  = 1
+			self.parallel = []
+			self.serial   = self.search
+		self.shard   = [] # Proteins to send to the pool [(ProtID, Seq), ...]
+		self.pending = deque() # Shards sent to the pool, in order
+		#-> The pool also reads the fasta file, in byte ranges, if all
+		#-> searches are done there
+		self.ranges = (
+			config.fasta['Ranges'] 
+			and self.workers > 1 
+			and not self.serial 
+			and not self.count
+			and all(pstFasta.Mappable(x) for x in self.iFileL)
+		)
 		#endregion --------------------------------------------------> Prepare
 
 		return True
@@ -314,130 +547,231 @@ class ConsensusTab(wx.Panel, pstWidget.UserInput):
 		#endregion ------------------------------------------------------> Msg
 
 		#region -----------------------------------------------------> Process
-		#--> Read and search file
-		with open(self.iFile, 'r') as iFile:
-			for line in iFile:
-				self.ltotal += 1
-				#--> Remove new line characters and strip line
-				l = dtsStr.Str2List(line, strip='b')[0]
-				#--> Discard empty lines
-				if l == '':
-					self.lempty += 1
-				#--> Process start of new protein in fasta file
-				elif l[0] == '>':
-					self.prottotal += 1
-					#--> Search conSeq in the sequence of the previous protein
-					if self.searchP:
-						tseq = ''.join(lseq)
-						self.SearchConsensusSeq(tseq, tprot)
-					else:
-						pass
-				 	#--> Setup analysis for this protein
-					if 'Fragment' in l:
-						self.protfrag += 1
-						if self.full:
-							self.searchP = False
+		#--> Process pool
+		if self.workers > 1:
+			pool = concurrent.futures.ProcessPoolExecutor(
+				max_workers = self.workers,
+				initializer = pstConsensus.InitWorker,
+				initargs    = ([x.engine for x in self.parallel],),
+			)
+		else:
+			pool = contextlib.nullcontext()
+		#--> Fragments are skipped if only complete proteins are searched, 
+		#--> unless the AAs are counted
+		if self.full and not self.count:
+			select = pstFasta.SelectComplete
+		else:
+			select = None
+		#--> Read and search files
+		with pool as self.pool:
+			if self.ranges:
+				#--> Read & search all files in the pool, results come in 
+				#--> file order
+				self.reader = pstFasta.FastaRangeReader(
+					self.iFileL,
+					self.pool,
+					work      = functools.partial(
+						pstConsensus.FindRecords, pos=self.parallel[0].occ),
+					select    = select,
+					progress  = self.ShowProgress,
+					blockSize = config.fasta['BlockSize'],
+					rangeSize = config.fasta['RangeSize'],
+				)
+				for protID, res in self.reader:
+					self.protsselT += len(protID)
+					self.MergeResult(
+						[self.ProtID(x, self.reader.source) for x in protID],
+						res,
+					)
+				self.AddCounters(self.reader)
+			else:
+				for fFile in self.iFileL:
+					self.reader = pstFasta.GetReader(
+						fFile, 
+						useMmap   = config.fasta['Mmap'],
+						select    = select, 
+						progress  = self.ShowProgress,
+						blockSize = config.fasta['BlockSize'],
+					)
+					for prot in self.reader:
+						if prot.fragment and self.full:
+							self.SearchProtein(prot.sequence, None, True)
 						else:
-							self.searchP    = True
 							self.protsselT += 1
-							tprot = l.split('|')[1]
-							lseq  = []
-					else:
-						self.searchP    = True
-						self.protsselT += 1
-						tprot = l.split('|')[1]
-						lseq  = []
-				#--> Proccess sequence line in fasta file
-				else:
-					if self.searchP:
-						lseq.append(l)
-					else:
-						pass
-				#--> Update GUI
-				if self.ltotal % 100 == 0:
-					msg = (f"Analysing --> Total lines: {self.ltotal}, "
-						f"Empty lines: {self.lempty}, "
-						f"Total proteins: {self.prottotal}, "
-						f"Matched proteins: {len(self.protSeq)}"
-					)
-					wx.CallAfter(dtsWidget.StatusBarUpdate, self.statusbar, msg)
+							self.SearchProtein(
+								prot.sequence, 
+								self.ProtID(prot.accession, fFile), 
+								prot.fragment,
+							)
+					self.AddCounters(self.reader)
+				#--> Collect the shards still in the pool
+				if self.pool is not None:
+					self.SubmitShard()
+					while self.pending:
+						self.MergeShard()
 				else:
 					pass
-		#--> Last past to catch the last protein
-		if self.searchP:
-			tseq = ''.join(lseq)
-			self.SearchConsensusSeq(tseq, tprot)
-		else:
-			pass 
-		#--> Calculate %
-		for k in self.seqProt.keys():
-			self.countTotal += self.seqProt[k]['Count']
-			self.seqProt[k]['PerCent'] = (
-				f"{(100 * self.seqProt[k]['Count'] / self.protsselT):.2f}"
-			)
-		#--> Sort results
-		if self.countTotal == 0:
-			pass
-		else:
-			self.seqProt = {
-				k: self.seqProt[k] 
-				for k in sorted(
-					self.seqProt, 
-					key     = lambda x: self.seqProt[x]['Count'],
-					reverse = True,
-				)
-			}
-			self.protSeq = {
-				k: self.protSeq[k]
-				for k in sorted(
-					self.protSeq,
-					key = lambda x: x,
-				)
-			}
+		#--> Select & sort results
+		for x in self.search:
+			x.Finish(self.protsselT)
 		#endregion --------------------------------------------------> Process
 
 		return True
 	#---
 
-	def SearchConsensusSeq(self, protSeq, protID):
-		"""Identify if the consensus sequences appear in the sequence of a 
-			proteins & updates the self.seqProt and self.protSeq dict
+	def ShowProgress(self, reader):
+		"""Show the progress of the analysis in the statusbar
+
+			Parameters
+			----------
+			reader : data.fasta.FastaReader, FastaMmapReader or 
+				FastaRangeReader
+				Reader of the current fasta file
+		"""
+		msg = (f"Analysing --> Total lines: {self.ltotal+reader.ltotal}, "
+			f"Empty lines: {self.lempty+reader.lempty}, "
+			f"Total proteins: {self.prottotal+reader.prottotal}, "
+			f"Matched proteins: {self.MatchedProt()}"
+		)
+		wx.CallAfter(dtsWidget.StatusBarUpdate, self.statusbar, msg)
+		return True
+	#---
+
+	def AddCounters(self, reader):
+		"""Add the counters of a finished fasta file
+
+			Parameters
+			----------
+			reader : data.fasta.FastaReader, FastaMmapReader or 
+				FastaRangeReader
+				Reader of the fasta file
+		"""
+		self.ltotal    += reader.ltotal
+		self.lempty    += reader.lempty
+		self.prottotal += reader.prottotal
+		self.protfrag  += reader.protfrag
+		return True
+	#---
+
+	def ProtID(self, accession, fFile):
+		"""Protein ID in the output. The name of the fasta file is added if
+			there are several files
+
+			Parameters
+			----------
+			accession : str
+				Protein accession
+			fFile : Path
+				Fasta file of the protein
+
+			Returns
+			-------
+			str
+				e.g. P31946 or P31946 (uniprot.fasta)
+		"""
+		if len(self.iFileL) > 1:
+			return f"{accession} ({fFile.name})"
+		else:
+			return accession
+	#---
+
+	def SearchProtein(self, protSeq, protID, frag=False):
+		"""Search the protein now or add it to the shard for the process pool
 
 			Parameters
 			----------
 			protSeq : str
 				Sequence of the protein as str
-			protID : str
-				Protein ID
+			protID : str or None
+				Protein ID. None if the protein is only used to count the AAs
+			frag : bool
+				The protein is a fragment
 		"""
-		#region -------------------------> Get sequence in the given positions
-		if self.Pos:
-			try:
-				seq = "".join([protSeq[x-1] for x in self.resID])
-			except IndexError:
-				return False
+		#region ---------------------------------------------------> AA count
+		for x in self.count:
+			x.AddCount(protSeq, frag)
+		if protID is None:
+			return True
 		else:
-			seq = protSeq
-		#endregion ----------------------> Get sequence in the given positions
-
-		#region ------------------------------------------------------> Update
-		for k in self.seqProt.keys():
-			if k in seq:
-				#--> Update self.seqProt
-				self.seqProt[k]['Count'] += 1
-				self.seqProt[k]['pID'] += protID+', '
-				#--> Update self.protSeq
-				if protID in self.protSeq:
-					self.protSeq[protID] += k+', '
-				else:
-					self.protSeq[protID] = k+', '
+			pass
+		#endregion ------------------------------------------------> AA count
+
+		#region ------------------------------------------------------> Serial
+		for x in self.serial:
+			x.Add(protSeq, protID)
+		#endregion ---------------------------------------------------> Serial
+
+		#region -------------------------------------------------------> Shard
+		if self.parallel:
+			self.shard.append((protID, protSeq))
+			if len(self.shard) >= config.consensus['ShardSize']:
+				self.SubmitShard()
 			else:
 				pass
-		#endregion ---------------------------------------------------> Update
+		else:
+			pass
+		#endregion ----------------------------------------------------> Shard
+
+		return True
+	#---
+
+	def SubmitShard(self):
+		"""Send the current shard to the process pool. Results are merged in
+			the same order the shards were sent to keep the output identical to
+			the serial search.
+		"""
+		#region ------------------------------------------------------> Submit
+		if self.shard:
+			protID, protSeq = zip(*self.shard)
+			self.pending.append(
+				(protID, self.pool.submit(
+					pstConsensus.FindShard, protSeq, self.parallel[0].occ))
+			)
+			self.shard = []
+		else:
+			pass
+		#endregion ---------------------------------------------------> Submit
+
+		#region -------------------------------> Limit the shards in the pool
+		while len(self.pending) > 2 * self.workers:
+			self.MergeShard()
+		#endregion ----------------------------> Limit the shards in the pool
+
+		return True
+	#---
 
+	def MergeShard(self):
+		"""Wait for the oldest shard in the pool and add its results"""
+		protID, future = self.pending.popleft()
+		return self.MergeResult(protID, future.result())
+	#---
+
+	def MergeResult(self, protID, result):
+		"""Add the results of a search done in the pool
+
+			Parameters
+			----------
+			protID : list of str
+				Protein IDs
+			result : list of list
+				Result of data.consensus.FindShard for the proteins
+		"""
+		for x, res in zip(self.parallel, result):
+			for pID, found in zip(protID, res):
+				x.UpdateConsensus(found, pID)
 		return True
 	#---
 
+	def MatchedProt(self):
+		"""Number of proteins with a conSeq in each configuration
+
+			Returns
+			-------
+			str
+		"""
+		return ", ".join([str(len(x.protSeq)) for x in self.search])
+	#---
+
 	def WriteOutput(self):
 		""""""
 		#region ---------------------------------------------------------> Msg
@@ -445,56 +779,48 @@ class ConsensusTab(wx.Panel, pstWidget.UserInput):
 		wx.CallAfter(dtsWidget.StatusBarUpdate, self.statusbar, msg)
 		#endregion ------------------------------------------------------> Msg
 
-		#region ---------------------------> Check there is something to write	
-		if self.countTotal == 0:
+		#region ---------------------------> Check there is something to write
+		if all(x.countTotal == 0 for x in self.search):
 			msg = config.msg['Error'][self.name]['NoConsensusFound']
 			dtsWindow.MessageDialog('errorF', msg, self)
 			return False
 		else:
 			pass
-		#endregion ------------------------> Check there is something to write	
+		#endregion ------------------------> Check there is something to write
 
 		#region -------------------------------------------------------> Write
-		#--> Write input data
-		oFile = open(self.oFile, 'w')
-		oFile.write('Input data:\n')
-		dtsFF.WriteDict2File(oFile, self.d)
-		oFile.write('\n')
-		#---
-		#--> Write output
-		oFile.write('Output data:\n')
-		oFile.write(f"Total proteins\t{self.prottotal}\n")
-		oFile.write(f"Complete proteins\t{self.prottotal-self.protfrag}\n")
-		oFile.write(f"Fragment proteins\t{self.protfrag}\n")
-		oFile.write(f"Consensus sequence in proteins\t{len(self.protSeq)}\n")
-
-		header = f'\nCount\tSequence\tPercent\tProtein IDs'
-		oFile.write(header+'\n')
-		for k,v in self.seqProt.items():
-			oFile.write(f"{v['Count']}\t{k}\t{v['PerCent']}\t{v['pID'][0:-2]}\n")
-
-		if not self.Pos:
-			oFile.write(f"\nProtein IDs\tSequences\n")
-			for k, v in self.protSeq.items():
-				oFile.write(f"{k}\t{v[0:-2]}\n")
-			oFile.write("\n")
-		else:
-			pass
-		#---
-		#--> File last line
-		if self.Pos:
-			oFile.write("\n")
-		else:
-			pass
-		dtsFF.WriteLastLine2File(oFile, config.title['MainW'])
+		for n, x in enumerate(self.search, start=1):
+			#--> One file per configuration, numbered if there are several
+			if len(self.search) == 1:
+				oPath = self.oFile
+				d     = self.d
+			else:
+				root, ext = os.path.splitext(self.oFile)
+				oPath = f"{root}-{n}{ext}"
+				d = dict(self.d)
+				d[config.label[self.name]['OutFile']] = oPath
+				d[config.label[self.name]['PosAA']]   = str(x.posAA)
+			#--> Write input data
+			oFile = open(oPath, 'w')
+			oFile.write('Input data:\n')
+			dtsFF.WriteDict2File(oFile, d)
+			oFile.write('\n')
+			#--> Write output
+			oFile.write('Output data:\n')
+			oFile.write(f"Total proteins\t{self.prottotal}\n")
+			oFile.write(f"Complete proteins\t{self.prottotal-self.protfrag}\n")
+			oFile.write(f"Fragment proteins\t{self.protfrag}\n")
+			x.WriteResults(oFile)
+			#--> File last line
+			dtsFF.WriteLastLine2File(oFile, config.title['MainW'])
+			oFile.close()
 		#---
-	 	#--> Close file and final summary in statusbar
-		oFile.close()
+	 	#--> Final summary in statusbar
 		msg = (
 			f"Analysing --> Total lines: {self.ltotal}, "
 			f"Empty lines: {self.lempty}, "
 			f"Total proteins: {self.prottotal}, "
-			f"Matched proteins: {len(self.protSeq)}"
+			f"Matched proteins: {self.MatchedProt()}"
 		)
 		wx.CallAfter(dtsWidget.StatusBarUpdate, self.statusbar, msg)
 		#---
@@ -553,7 +879,7 @@ class GeneTab(wx.Panel, pstWidget.UserInput):
 			self.sbFile,
 			btnLabel  = config.label[name]['GeneFile'],
 			tcHint    = config.hint[name]['GeneFile'],
-			ext       = config.extLong['Data'],
+			ext       = config.extLong['DataIn'],
 			validator = dtsValidator.IsNotEmpty(
 				parent,
 				config.msg['Error'][name]['GeneFile'],
@@ -575,12 +901,9 @@ class GeneTab(wx.Panel, pstWidget.UserInput):
 			self.sbValue,
 			stLabel   = config.label[name]['ResidueExtract'],
 			tcHint    = config.hint[name]['ResidueExtract'],
-			validator = dtsValidator.NumberList(
+			validator = dtsValidator.IsNotEmpty(
 				parent,
 				config.msg['Error'][name]['ResidueExtract'],
-				isList = True,
-				refMin = 1,
-
 			),
 		)
 		#endregion --------------------------------------------------> Widgets
@@ -681,6 +1004,19 @@ class GeneTab(wx.Panel, pstWidget.UserInput):
 			pass
 		else:
 			return False
+		try:
+			fFileL = pstFasta.FastaFiles(self.fastaFile.tc.GetValue())
+		except ValueError as e:
+			msg = f"{config.msg['Error'][self.name]['FastaFileList']}\n{e}"
+			dtsWindow.MessageDialog('errorF', msg, parent=self.parent)
+			return False
+		for x in fFileL:
+			if pstCompress.Supported(x):
+				pass
+			else:
+				msg = f"{config.msg['Error'][self.name]['Zstd']}\n{x}"
+				dtsWindow.MessageDialog('errorF', msg, parent=self.parent)
+				return False
 
 		msg = f"{msgM}: {config.label[self.name]['GeneFile']}"
 		wx.CallAfter(dtsWidget.StatusBarUpdate, self.statusbar, msg)
@@ -702,31 +1038,61 @@ class GeneTab(wx.Panel, pstWidget.UserInput):
 			pass
 		else:
 			return False
+		try:
+			pstGene.ReadWindows(self.residueExtract.tc.GetValue())
+		except ValueError as e:
+			msg = f"{config.msg['Error'][self.name]['ResidueExtract']}\n{e}"
+			dtsWindow.MessageDialog('errorF', msg, parent=self.parent)
+			return False
 		#endregion ----------------------------------------> Individual Fields
 
 		#region ------------------------------------------------> File content
-		#--> Gene names
-		self.gFile    = self.geneFile.tc.GetValue()
-		self.geneList = []
-		with open(self.gFile, 'r') as gFile:
-			for line in gFile:
-				g = "".join(line.split())
-				g = g.replace('"', "")
-				if g == '':
-					continue
-				else:
-					pass
-				self.geneList.append(g)
-				if ";" in g:
-					[self.geneList.append(x) for x in g.split(";")]
-				else:
-					pass
-		if not self.geneList:
-			msg = config.error[self.name]['NoGene']
+		#--> Gene Files. One GeneSearch for each project
+		self.gFile = self.geneFile.tc.GetValue()
+		try:
+			self.gFileL = pstGene.GeneFiles(self.gFile)
+		except ValueError as e:
+			msg = f"{config.msg['Error'][self.name]['GeneFileList']}\n{e}"
 			dtsWindow.MessageDialog('errorF', msg, parent=self.parent)
 			return False
-		else:
-			pass
+		for x in self.gFileL:
+			if pstCompress.Supported(x):
+				pass
+			else:
+				msg = f"{config.msg['Error'][self.name]['Zstd']}\n{x}"
+				dtsWindow.MessageDialog('errorF', msg, parent=self.parent)
+				return False
+		self.geneFold = config.gene['CaseFold']
+		try:
+			self.search = [
+				pstGene.GeneSearch(
+					x, 
+					o, 
+					fold       = self.geneFold, 
+					bufferRows = config.gene['BufferRows'],
+				)
+				for x, o in zip(
+					self.gFileL,
+					pstGene.OutFiles(self.outFile.tc.GetValue(), self.gFileL),
+				)
+			]
+		except ValueError as e:
+			msg = f"{config.msg['Error'][self.name]['GeneFileRead']}\n{e}"
+			dtsWindow.MessageDialog('errorF', msg, parent=self.parent)
+			return False
+		for x in self.search:
+			if not x.geneSet:
+				msg = f"{config.msg['Error'][self.name]['NoGene']}\n{x.gFile}"
+				dtsWindow.MessageDialog('errorF', msg, parent=self.parent)
+				return False
+			else:
+				pass
+		#--> Gene names. Projects of each gene
+		self.geneProj = {}
+		for x in self.search:
+			for k in x.geneSet:
+				self.geneProj.setdefault(k, []).append(x)
+		self.geneSet = frozenset(self.geneProj)
 		#---
 		#endregion ---------------------------------------------> File content
 
@@ -745,13 +1111,11 @@ class GeneTab(wx.Panel, pstWidget.UserInput):
 		# Check Gene file content
 		#--> Input values
 		self.fFile  = self.fastaFile.tc.GetValue()
+		self.fFileL = pstFasta.FastaFiles(self.fFile)
 		self.oFile  = self.outFile.tc.GetValue()
-		self.resExt = list(
-			map(
-				int, 
-				self.residueExtract.tc.GetValue().split()
-			)
-		)
+		self.windows = pstGene.ReadWindows(self.residueExtract.tc.GetValue())
+		self.slices  = [x for _, x in self.windows]
+		self.stop    = pstGene.WindowStop(self.windows)
 		resExtStr = " ".join(self.residueExtract.tc.GetValue().split())
 		#---
 		#--> For output
@@ -767,8 +1131,6 @@ class GeneTab(wx.Panel, pstWidget.UserInput):
 		self.lempty    = 0
 		self.prottotal = 0
 		self.protsselT = 0
-		self.searchP   = False
-		self.dataO     = []
 		#---
 		#endregion --------------------------------------------------> Prepare
 		
@@ -783,67 +1145,211 @@ class GeneTab(wx.Panel, pstWidget.UserInput):
 		#endregion ------------------------------------------------------> Msg
 
 		#region -----------------------------------------------------> Process
-		with open(self.fFile, 'r') as File:
-			for line in File:
-				self.ltotal += 1
-				#--> Remove new line characters and strip line
-				l = dtsStr.Str2List(line, strip='b')[0]
-				#--> Discard empty lines
-				if l == '':
-					self.lempty += 1
-				#--> Process line containing a fasta header
-				elif l[0] == '>':
-					self.prottotal += 1
-					#--> Finish processing of previous sequence
-					if self.searchP:
-						lseq = ''.join(lseq)
-						for i in self.resExt:
-							ltemp.append(lseq[0:i])
-						self.dataO.append(ltemp)
-					else:
-						pass
-					#--> Setup analysis of a new protein
-					if 'GN=' in l:
-						tGene = [s for s in l.split() if 'GN=' in s][0].split('=')[1]
-						if tGene in self.geneList:
-							self.searchP = True
-							self.protsselT += 1
-							ltemp = []
-							lseq = []
-							ltemp.append(tGene)
-							ltemp.append(l.split('|')[1])
-						else:
-							self.searchP = False
-					else:
-						self.searchP = False
-				#--> Process line containing a sequence line
+		#--> Index of each file. None if the file is not read with an index
+		index = [
+			pstFasta.FastaIndex(
+				x, 
+				progress  = self.ShowProgress,
+				blockSize = config.fasta['BlockSize'],
+			) if config.fasta['Index'] and pstFasta.Mappable(x) else None
+			for x in self.fFileL
+		]
+		loaded = [x is not None and x.Load() for x in index]
+		#--> Read all files at once in byte ranges in a process pool, unless 
+		#--> all of them can be read with their index. The indexes are built
+		#--> in the same pass
+		if (config.fasta['Ranges'] 
+			and config.fasta['Workers'] > 1
+			and all(pstFasta.Mappable(x) for x in self.fFileL)
+			and not all(loaded)
+			):
+			self.ReadRanges(index)
+		else:
+			for fFile, x, l in zip(self.fFileL, index, loaded):
+				self.ReadFile(fFile, x, l)
+		#endregion --------------------------------------------------> Process
+
+		#region ----------------------------------------------------> Projects
+		for x in self.search:
+			x.Finish()
+		#endregion -------------------------------------------------> Projects
+
+		return True
+	#---
+
+	def ReadFile(self, fFile, index=None, loaded=False):
+		"""Read the proteins of the genes in a fasta file
+
+			Parameters
+			----------
+			fFile : Path
+				Fasta file
+			index : data.fasta.FastaIndex or None
+				Index of the file. None reads the whole file
+			loaded : bool
+				The index was loaded with FastaIndex.Load. It is built if not.
+				The index is closed after the read
+		"""
+		#region ------------------------------------------------------> Reader
+		select = functools.partial(
+			pstFasta.SelectGene, self.geneSet, fold=self.geneFold)
+		#--> Read only the proteins of the genes if the file is indexed
+		if index is not None:
+			self.reader = index
+			if loaded:
+				prots = self.reader.Gene(self.geneSet, fold=self.geneFold)
+			else:
+				prots = filter(select, self.reader.Build())
+		else:
+			self.reader = pstFasta.GetReader(
+				fFile, 
+				useMmap   = config.fasta['Mmap'],
+				select    = select,
+				progress  = self.ShowProgress,
+				blockSize = config.fasta['BlockSize'],
+			)
+			prots = self.reader
+		#endregion ---------------------------------------------------> Reader
+
+		#region ----------------------------------------------------> Proteins
+		try:
+			for prot in prots:
+				ltemp = [prot.gene, prot.accession]
+				#--> Join only the residues needed by the windows
+				if self.stop is None:
+					seq = prot.sequence
 				else:
-					if self.searchP:
-						lseq.append(l)
-					else:
-						pass
-				#--> Update statusbar
-				if not self.ltotal % 100:
-					msg = (
-						f"Analysing --> Total lines: {self.ltotal}, "
-						f"Empty lines: {self.lempty}, "
-						f"Total Proteins: {self.prottotal}, "
-						f"Matched Proteins:  {self.protsselT}"
-					)
-					wx.CallAfter(dtsWidget.StatusBarUpdate, self.statusbar, msg)
+					seq = prot.Prefix(self.stop)
+				for x in self.slices:
+					ltemp.append(seq[x])
+				if len(self.fFileL) > 1:
+					ltemp.append(fFile.name)
 				else:
 					pass
-		#--> Last pass to catch the last protein
-		if self.searchP:
-			lseq = ''.join(lseq)
-			for i in self.resExt:
-				ltemp.append(lseq[0:i])
-			self.dataO.append(ltemp)
+				self.AddRow(ltemp)
+		finally:
+			if index is not None:
+				index.Close()
+			else:
+				pass
+		self.AddCounters(self.reader)
+		#endregion -------------------------------------------------> Proteins
+
+		return True
+	#---
+
+	def ReadRanges(self, index):
+		"""Read the fasta files in byte ranges in a process pool. Each worker
+			returns only the rows of the output for the proteins of the genes
+			and, if the files are indexed, the index of its range
+
+			Parameters
+			----------
+			index : list
+				data.fasta.FastaIndex of each file, built again here, or None
+				if the files are not indexed
+		"""
+		#region -----------------------------------------------------> Workers
+		work = functools.partial(
+			pstFasta.SliceRows, slices=self.slices, stop=self.stop)
+		select = functools.partial(
+			pstFasta.SelectGene, self.geneSet, fold=self.geneFold)
+		build = all(x is not None for x in index)
+		if build:
+			work = functools.partial(
+				pstFasta.IndexRange, work=work, select=select)
+			select = None
+			fIndex = dict(zip(self.fFileL, index))
+			for x in index:
+				x.Clear(x.Stamp())
 		else:
 			pass
-		#---
-		#endregion --------------------------------------------------> Process
+		#endregion --------------------------------------------------> Workers
+
+		#region ------------------------------------------------------> Ranges
+		with concurrent.futures.ProcessPoolExecutor(
+			max_workers=config.fasta['Workers']) as pool:
+			self.reader = pstFasta.FastaRangeReader(
+				self.fFileL,
+				pool,
+				work      = work,
+				select    = select,
+				progress  = self.ShowProgress,
+				blockSize = config.fasta['BlockSize'],
+				rangeSize = config.fasta['RangeSize'],
+			)
+			for rows in self.reader:
+				if build:
+					part, rows = rows
+					fIndex[self.reader.source].Extend(part)
+				else:
+					pass
+				for r in rows:
+					if len(self.fFileL) > 1:
+						r.append(self.reader.source.name)
+					else:
+						pass
+					self.AddRow(r)
+		self.AddCounters(self.reader)
+		#endregion ---------------------------------------------------> Ranges
 
+		#region -------------------------------------------------------> Index
+		if build:
+			for x in index:
+				x.Save()
+		else:
+			pass
+		#endregion ----------------------------------------------------> Index
+
+		return True
+	#---
+
+	def AddRow(self, row):
+		"""Add a protein to the results of all projects with its gene
+
+			Parameters
+			----------
+			row : list
+				Row of the output, [gene, accession, seq, ...]
+		"""
+		self.protsselT += 1
+		key = pstFasta.GeneKey(row[0], self.geneFold)
+		for x in self.geneProj[key]:
+			x.Add(row, key)
+		return True
+	#---
+
+	def ShowProgress(self, reader):
+		"""Show the progress of the analysis in the statusbar
+
+			Parameters
+			----------
+			reader : data.fasta.FastaReader, FastaMmapReader, FastaIndex or
+				FastaRangeReader
+				Reader of the current fasta file
+		"""
+		msg = (
+			f"Analysing --> Total lines: {self.ltotal+reader.ltotal}, "
+			f"Empty lines: {self.lempty+reader.lempty}, "
+			f"Total Proteins: {self.prottotal+reader.prottotal}, "
+			f"Matched Proteins:  {self.protsselT}"
+		)
+		wx.CallAfter(dtsWidget.StatusBarUpdate, self.statusbar, msg)
+		return True
+	#---
+
+	def AddCounters(self, reader):
+		"""Add the counters of a finished fasta file
+
+			Parameters
+			----------
+			reader : data.fasta.FastaReader, FastaMmapReader, FastaIndex or
+				FastaRangeReader
+				Reader of the fasta file
+		"""
+		self.ltotal    += reader.ltotal
+		self.lempty    += reader.lempty
+		self.prottotal += reader.prottotal
 		return True
 	#---
 
@@ -864,31 +1370,48 @@ class GeneTab(wx.Panel, pstWidget.UserInput):
 		#endregion ------------------------> Check there is something to write	
 
 		#region -------------------------------------------------------> Write
-		#--> Write input data
-		oFile = open(self.oFile, 'w')
-		oFile.write('Input data:\n')
-		dtsFF.WriteDict2File(oFile, self.d)
-		oFile.write('\n')
-		#---
-		#--> Write output
-		oFile.write('Output data:\n')
-		header = 'Gene\tProtein\t' + "\t".join(['1-'+str(x) for x in self.resExt])
-		oFile.write(header+'\n')
-
-		self.dataO.sort(key=itemgetter(0, 1))
-		dtsFF.WriteList2File(oFile, self.dataO)
-		oFile.write('\n')
-		#---
-		#--> File last line
-		dtsFF.WriteLastLine2File(oFile, config.title['MainW'])
+		header = 'Gene\tProtein\t' + "\t".join([x for x, _ in self.windows])
+		if len(self.fFileL) > 1:
+			header += '\tFile'
+		else:
+			pass
+		for x in self.search:
+			#--> One file per Gene File
+			if len(self.search) == 1:
+				d = self.d
+			else:
+				d = dict(self.d)
+				d[config.label[self.name]['GeneFile']] = str(x.gFile)
+				d[config.label[self.name]['OutFile']]  = x.oFile
+			#--> Write input data
+			oFile = open(x.oFile, 'w')
+			oFile.write('Input data:\n')
+			dtsFF.WriteDict2File(oFile, d)
+			oFile.write('\n')
+			#--> Write output
+			oFile.write('Output data:\n')
+			oFile.write(header+'\n')
+			for rows in x.Rows():
+				dtsFF.WriteList2File(oFile, rows)
+			oFile.write('\n')
+			#--> Genes without proteins in the fasta file
+			if x.geneMiss:
+				oFile.write('Genes not found:\n')
+				oFile.write('\n'.join(x.geneMiss)+'\n')
+				oFile.write('\n')
+			else:
+				pass
+			#--> File last line
+			dtsFF.WriteLastLine2File(oFile, config.title['MainW'])
+			oFile.close()
 		#---
-	 	#--> Close file and final summary in statusbar
-		oFile.close()
+	 	#--> Final summary in statusbar
 		msg = (
 			f"Final count --> Total lines: {self.ltotal}, "
 			f"Empty lines: {self.lempty}, "
 			f"Total Proteins: {self.prottotal}, "
-			f"Matched Proteins:  {self.protsselT}"
+			f"Matched Proteins:  {self.protsselT}, "
+			f"Genes not found: {sum(len(x.geneMiss) for x in self.search)}"
 		)
 		wx.CallAfter(dtsWidget.StatusBarUpdate, self.statusbar, msg)
 		#---
@@ -25,8 +25,6 @@
 """
 
 #region -------------------------------------------------------------- Imports
-import ast
-
 import wx
 import wx.lib.agw.aui as aui
 
@@ -35,6 +33,7 @@ import dat4s_core.widget.wx_widget as dtsWidget
 import dat4s_core.widget.wx_window as dtsWindow
 
 import config.config as config
+import data.consensus as pstConsensus
 import menu.menu as menu
 import gui.tab as pstTab
 #endregion ----------------------------------------------------------- Imports
@@ -224,6 +223,10 @@ class ConsensusConf(wx.Dialog):
 			size = config.size['ScrolledW'][name],
 		)
 		self.swMatrix.SetBackgroundColour('WHITE')
+		self.cbAppend = wx.CheckBox(
+			self,
+			label = config.label[name]['Append'],
+		)
 		#endregion --------------------------------------------------> Widgets
 		
 		#region ------------------------------------------------------> Sizers
@@ -236,7 +239,7 @@ class ConsensusConf(wx.Dialog):
 		self.swMatrix.SetSizer(self.swSizer)
 		self.swSizer.AddGrowableCol(2, 1)
 		#--> Main sizer
-		self.Sizer = wx.FlexGridSizer(3, 1, 1, 1)
+		self.Sizer = wx.FlexGridSizer(4, 1, 1, 1)
 		self.Sizer.Add(
 			self.nRes.Sizer,
 			border = 5,
@@ -247,6 +250,11 @@ class ConsensusConf(wx.Dialog):
 			border = 5,
 			flag   = wx.EXPAND|wx.ALL,
 		)
+		self.Sizer.Add(
+			self.cbAppend,
+			border = 5,
+			flag   = wx.ALIGN_LEFT|wx.ALL,
+		)
 		self.Sizer.Add(
 			self.btnSizer,
 			border = 5,
@@ -276,16 +284,20 @@ class ConsensusConf(wx.Dialog):
 
 	#region ---------------------------------------------------> Class methods
 	def OnInitVal(self):
-		"""Fill the fields in the window if parent.posAA is not empty """
+		"""Fill the fields in the window if parent.posAA is not empty. With a
+			list of Positions & AAs the last one is shown
+		"""
 		#region -------------------------------> Get string from parent window
 		tStr = self.parent.posAA.tc.GetValue()
 		#endregion ----------------------------> Get string from parent window
 		
 		#region ----------------------------------------> Create & fill fields
-		if tStr == '':
+		try:
+			tDict = pstConsensus.ReadPosAA(
+				tStr, config.dictKey[self.name]['PosKey'])[-1]
+		except ValueError:
 			return False
 		else:
-			tDict = ast.literal_eval(tStr)
 			#--> To exclude the position key
 			NRow = len(tDict) - 1
 			Pos = tDict[config.dictKey[self.name]['PosKey']]
@@ -536,7 +548,8 @@ class ConsensusConf(wx.Dialog):
 			e.g. {'2': 'A C', '3': 'F G', 'Pos': True}. The keys are the
 			residue numbers in which the consensus sequence is searched.
 			The Pos key is boolean to discard the residue numbers (False) or
-			use them in the analysis.
+			use them in the analysis. If self.cbAppend is checked the dict is
+			added to the Positions & AAs already in tc.
 		"""
 		#region ------------------------------------------> Create & Fill dict
 		#--> Dict
@@ -556,7 +569,16 @@ class ConsensusConf(wx.Dialog):
 		#endregion ---------------------------------------> Create & Fill dict
 
 		#region ---------------------------------------------> Export
-		tc.SetValue(str(myDict))
+		if self.cbAppend.GetValue():
+			try:
+				myList = pstConsensus.ReadPosAA(
+					tc.GetValue(), config.dictKey[self.name]['PosKey'])
+			except ValueError:
+				myList = []
+			myList.append(myDict)
+			tc.SetValue(str(myList) if len(myList) > 1 else str(myDict))
+		else:
+			tc.SetValue(str(myDict))
 		#endregion ------------------------------------------> Export
 		
 		return True
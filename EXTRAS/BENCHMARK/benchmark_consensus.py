@@ -0,0 +1,102 @@
+# ------------------------------------------------------------------------------
+# Author: Kenny Bravo Rodriguez 2019 (kenny.bravorodriguez@mpi-dortmund.mpg.de)
+# 
+# Copyright (c) 2019 Max Planck Institute of Molecular Physiology
+#
+# This complete copyright notice must be included in any revised version of the
+# source code. Additional authorship citations may be added, but existing
+# author citations must be preserved.
+# 
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ------------------------------------------------------------------------------
+
+""" Compare the search engines for consensus sequences in the whole sequence.
+
+	Usage: python benchmark_consensus.py [fasta_file]
+
+	Without a fasta file, a random proteome is used.
+"""
+
+#region -------------------------------------------------------------> Imports
+import itertools
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'CODE'))
+
+import data.consensus as pstConsensus
+#endregion ----------------------------------------------------------> Imports
+
+#region -----------------------------------------------------------> VARIABLES
+AA    = 'ACDEFGHIKLMNPQRSTVWY'
+allAA = [
+	['A', 'W', 'S'], ['S', 'T', 'G'], ['I', 'A', 'L'], ['K', 'R', 'H'], ['L', 'V', 'I'],
+	['E', 'D'], ['P', 'A', 'G'],
+]
+#endregion --------------------------------------------------------> VARIABLES
+
+#region ------------------------------------------------------------> Proteins
+if len(sys.argv) > 1:
+	seqs = []
+	lseq = []
+	with open(sys.argv[1], 'r') as iFile:
+		for line in iFile:
+			l = line.strip()
+			if l.startswith('>'):
+				if lseq:
+					seqs.append(''.join(lseq))
+				else:
+					pass
+				lseq = []
+			else:
+				lseq.append(l)
+	if lseq:
+		seqs.append(''.join(lseq))
+	else:
+		pass
+else:
+	rnd  = random.Random(0)
+	seqs = [
+		''.join(rnd.choices(AA, k=rnd.randint(50, 1500))) for _ in range(2000)
+	]
+print(f"Proteins: {len(seqs)}, Residues: {sum(map(len, seqs))}")
+#endregion ---------------------------------------------------------> Proteins
+
+#region -------------------------------------------------------------> Engines
+conSeq = ["".join(v) for v in itertools.product(*allAA)]
+engines = {
+	'Loop'       : pstConsensus.PatternLoop(conSeq),
+	'AhoCorasick': pstConsensus.AhoCorasick(conSeq),
+	'Regex'      : pstConsensus.RegexClass(allAA),
+	'ShiftAnd'   : pstConsensus.ShiftAnd(allAA),
+}
+#endregion ----------------------------------------------------------> Engines
+
+#region -----------------------------------------------------------> Benchmark
+ref    = None
+tLoop  = None
+for name, engine in engines.items():
+	start = time.perf_counter()
+	res   = [engine.Find(s) for s in seqs]
+	t     = time.perf_counter() - start
+	if ref is None:
+		ref   = res
+		tLoop = t
+	else:
+		pass
+	same = 'identical' if res == ref else 'DIFFERENT'
+	print(f"{name:<12}{t:>9.3f} s {tLoop/t:>8.1f}x  {same}")
+#endregion --------------------------------------------------------> Benchmark
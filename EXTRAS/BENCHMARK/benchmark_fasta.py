@@ -0,0 +1,174 @@
+# ------------------------------------------------------------------------------
+# Author: Kenny Bravo Rodriguez 2019 (kenny.bravorodriguez@mpi-dortmund.mpg.de)
+#
+# Copyright (c) 2019 Max Planck Institute of Molecular Physiology
+#
+# This complete copyright notice must be included in any revised version of the
+# source code. Additional authorship citations may be added, but existing
+# author citations must be preserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ------------------------------------------------------------------------------
+
+""" Compare the line loop used before in the Gene and Consensus tabs with
+	data.fasta.FastaReader and data.fasta.FastaMmapReader.
+
+	Usage: python benchmark_fasta.py [fasta_file]
+
+	Without a fasta file, a random proteome is written to a temporary file.
+"""
+
+#region -------------------------------------------------------------> Imports
+import os
+import random
+import sys
+import tempfile
+import time
+import types
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'CODE'))
+
+import data.fasta as pstFasta
+
+try:
+	import dat4s_core.data.string as dtsStr
+	Line = lambda x: dtsStr.Str2List(x, strip='b')[0]
+except ImportError:
+	Line = lambda x: x.strip()
+#endregion ----------------------------------------------------------> Imports
+
+#region -----------------------------------------------------------> VARIABLES
+AA    = 'ACDEFGHIKLMNPQRSTVWY'
+genes = {f'G{x}' for x in range(0, 2000, 40)}
+#endregion --------------------------------------------------------> VARIABLES
+
+#region -------------------------------------------------------------> Methods
+def LineLoop(fFile, genes):
+	"""Loop of the tabs before data.fasta. Returns the (gene, accession, seq)
+		of the proteins with a gene in genes or of all proteins if genes is
+		None, like in the Consensus tab. The counters are kept in an object as
+		the tabs kept them in self.
+	"""
+	res     = []
+	searchP = False
+	c       = types.SimpleNamespace(ltotal=0, lempty=0, prottotal=0)
+	with open(fFile, 'r') as file:
+		for line in file:
+			c.ltotal += 1
+			l = Line(line)
+			if l == '':
+				c.lempty += 1
+			elif l[0] == '>':
+				c.prottotal += 1
+				if searchP:
+					res.append((tGene, tProt, ''.join(lseq)))
+				else:
+					pass
+				if genes is None:
+					searchP = True
+					tGene   = None
+					tProt   = l.split('|')[1]
+					lseq    = []
+				elif 'GN=' in l:
+					tGene = [s for s in l.split() if 'GN=' in s][0].split('=')[1]
+					if tGene in genes:
+						searchP = True
+						tProt   = l.split('|')[1]
+						lseq    = []
+					else:
+						searchP = False
+				else:
+					searchP = False
+			else:
+				if searchP:
+					lseq.append(l)
+				else:
+					pass
+			if c.ltotal % 100 == 0:
+				pass
+			else:
+				pass
+	if searchP:
+		res.append((tGene, tProt, ''.join(lseq)))
+	else:
+		pass
+	return res
+#---
+
+def Reader(fFile, genes, cls=pstFasta.FastaReader):
+	"""Same result with data.fasta.FastaReader"""
+	if genes is None:
+		reader = cls(fFile)
+		return [(None, x.accession, x.sequence) for x in reader]
+	else:
+		reader = cls(fFile, select=lambda x: x.gene in genes)
+		return [(x.gene, x.accession, x.sequence) for x in reader]
+#---
+
+def MmapReader(fFile, genes):
+	"""Same result with data.fasta.FastaMmapReader"""
+	return Reader(fFile, genes, cls=pstFasta.FastaMmapReader)
+#---
+#endregion ----------------------------------------------------------> Methods
+
+#region ------------------------------------------------------------> Proteins
+if len(sys.argv) > 1:
+	fFile = sys.argv[1]
+	tmp   = None
+else:
+	rnd = random.Random(0)
+	tmp = tempfile.NamedTemporaryFile('w', suffix='.fasta', delete=False)
+	for i in range(50000):
+		seq = ''.join(rnd.choices(AA, k=rnd.randint(50, 1500)))
+		tmp.write(
+			f">sp|P{i:05d}|X{i}_HUMAN Protein OS=Homo sapiens OX=9606 "
+			f"GN=G{rnd.randrange(2000)} PE=1 SV=1\n"
+		)
+		tmp.write("\n".join(seq[j:j+60] for j in range(0, len(seq), 60)))
+		tmp.write("\n")
+	tmp.close()
+	fFile = tmp.name
+print(f"File: {fFile}, Size: {os.path.getsize(fFile)/2**20:.1f} MB")
+#endregion ---------------------------------------------------------> Proteins
+
+#region -----------------------------------------------------------> Benchmark
+for label, sel in (('Gene tab', genes), ('Consensus tab', None)):
+	print(label)
+	ref   = None
+	tLoop = None
+	for name, method in (
+		('Line loop', LineLoop), 
+		('FastaReader', Reader), 
+		('Mmap reader', MmapReader),
+		):
+		#--> Best of 3 runs
+		t = []
+		for _ in range(3):
+			start = time.perf_counter()
+			res   = method(fFile, sel)
+			t.append(time.perf_counter() - start)
+		t = min(t)
+		if ref is None:
+			ref   = res
+			tLoop = t
+		else:
+			pass
+		same = 'identical' if res == ref else 'DIFFERENT'
+		print(f"  {name:<12}{t:>9.3f} s {tLoop/t:>8.1f}x  {same}")
+if tmp is not None:
+	os.unlink(tmp.name)
+else:
+	pass
+#endregion --------------------------------------------------------> Benchmark
@@ -0,0 +1,69 @@
+# ------------------------------------------------------------------------------
+# Author: Kenny Bravo Rodriguez 2019 (kenny.bravorodriguez@mpi-dortmund.mpg.de)
+#
+# Copyright (c) 2019 Max Planck Institute of Molecular Physiology
+#
+# This complete copyright notice must be included in any revised version of the
+# source code. Additional authorship citations may be added, but existing
+# author citations must be preserved.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+# ------------------------------------------------------------------------------
+
+""" Convert a fasta file into a protein store for the Gene and Consensus tabs.
+
+	Usage: python fasta2store.py fasta_file [store_file]
+
+	The fasta file can be compressed. The default store file is the fasta 
+	file with the extension .pstdb, e.g. uniprot.fasta.gz -> uniprot.pstdb
+"""
+
+#region -------------------------------------------------------------> Imports
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'CODE'))
+
+import data.fasta as pstFasta
+#endregion ----------------------------------------------------------> Imports
+
+#region -------------------------------------------------------------> Methods
+def Progress(reader):
+	"""Show the number of proteins read so far"""
+	print(f"\r  Proteins: {reader.prottotal}", end='', flush=True)
+	return True
+#---
+#endregion ----------------------------------------------------------> Methods
+
+#region -------------------------------------------------------------> Convert
+if len(sys.argv) < 2:
+	print(__doc__)
+	sys.exit(1)
+else:
+	pass
+fFile = Path(sys.argv[1])
+if len(sys.argv) > 2:
+	sFile = Path(sys.argv[2])
+else:
+	sFile = fFile.parent / (fFile.name.split('.')[0] + '.pstdb')
+print(f"Fasta file: {fFile}")
+print(f"Store file: {sFile}")
+start  = time.perf_counter()
+reader = pstFasta.WriteStore(fFile, sFile, progress=Progress)
+print(
+	f"\r  Proteins: {reader.prottotal}, Fragments: {reader.protfrag}, "
+	f"Time: {time.perf_counter()-start:.1f} s"
+)
+#endregion ----------------------------------------------------------> Convert